@@ -12,6 +12,32 @@ from utils import pdf_utils
 from utils import epub_utils
 from utils import file_merge_utils
 from utils import ebook_finder_utils
+from utils import cache_utils
+from utils import ocr_utils
+
+# Pages extracted by the PDF tab's "Quick preview" option
+QUICK_PREVIEW_PAGES = 3
+
+# PDF tab method labels and the pdf_utils method names they stand for
+PDF_METHOD_NAMES = {
+    "Auto-select": 'auto',
+    "PyMuPDF": 'pymupdf',
+    "PyMuPDF (Layout)": 'layout',
+    "pdfminer.six": 'pdfminer',
+    "Tesseract OCR": 'tesseract',
+    "Hybrid/Auto": 'hybrid'
+}
+
+# Download formats offered by the PDF tab
+PDF_OUTPUT_FORMATS = ("Text (.txt)", "JSON Lines (.jsonl)")
+
+# EPUB tab conversion labels and the epub_utils output formats they stand for
+EPUB_CONVERSIONS = {
+    "EPUB to HTML": 'html',
+    "EPUB to Clean Text": 'text',
+    "EPUB to Styled PDF": 'pdf',
+    "EPUB to Word (.docx)": 'docx'
+}
 
 
 def main():
@@ -51,6 +77,24 @@ def main():
     render_sidebar()
 
 
+@st.cache_resource
+def get_extraction_cache():
+    """Open the on-disk extraction cache once per server process."""
+    return cache_utils.ExtractionCache()
+
+
+@st.cache_resource
+def get_page_cache():
+    """Open the on-disk per-page OCR cache once per server process."""
+    return cache_utils.open_page_cache()
+
+
+@st.cache_resource
+def get_chapter_cache():
+    """Open the on-disk per-chapter EPUB text cache once per server process."""
+    return cache_utils.open_chapter_cache()
+
+
 def render_sidebar():
     """Render application sidebar with information."""
     st.sidebar.title("ℹ️ About")
@@ -74,6 +118,57 @@ def render_sidebar():
     )
     st.session_state['tesseract_path'] = tesseract_path
     
+    # Parallel extraction configuration
+    workers = st.sidebar.number_input(
+        "Worker Processes",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=1,
+        help="Processes used to extract large PDFs and EPUBs in parallel"
+    )
+    st.session_state['workers'] = int(workers)
+    
+    # OCR rasterization resolution
+    ocr_dpi = st.sidebar.number_input(
+        "OCR DPI",
+        min_value=72,
+        max_value=600,
+        value=200,
+        step=50,
+        help="Resolution used to rasterize pages for Tesseract OCR"
+    )
+    st.session_state['ocr_dpi'] = int(ocr_dpi)
+    
+    # OCR engine
+    ocr_engine = st.sidebar.selectbox(
+        "OCR Engine",
+        ("auto",) + ocr_utils.available_engines(),
+        help="tesserocr keeps Tesseract loaded in-process; tesseract-batch runs one "
+             "tesseract per batch of pages; tesseract runs one process per page"
+    )
+    st.session_state['ocr_engine'] = ocr_engine
+    
+    # Extraction cache
+    use_cache = st.sidebar.checkbox(
+        "Cache extraction results",
+        value=True,
+        help="Reuse text extracted earlier from identical files and unchanged EPUB chapters"
+    )
+    st.session_state['use_cache'] = use_cache
+    if use_cache:
+        cache = get_extraction_cache()
+        refresh_col, clear_col = st.sidebar.columns(2)
+        refresh = refresh_col.button("Refresh", help="Rescan the cache folder for its current size")
+        if clear_col.button("Clear cache", help="Delete every cached extraction result"):
+            cache.clear()
+        stats = cache.stats(refresh=refresh)
+        st.sidebar.caption(
+            f"Cache: {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['entries']} entries, "
+            f"{stats['size_bytes'] / 1024 / 1024:.1f} of "
+            f"{stats['max_bytes'] / 1024 / 1024:.0f} MB"
+        )
+    
     st.sidebar.markdown("---")
     st.sidebar.markdown('📖 [GitHub Repository](https://github.com/kunalsuri/)')
     st.sidebar.markdown('Made with ❤️ using Streamlit')
@@ -90,16 +185,19 @@ def pdf_to_text_ui():
     with col1:
         method = st.selectbox(
             "Select Extraction Method",
-            ["PyMuPDF", "pdfminer.six", "Tesseract OCR"],
+            list(PDF_METHOD_NAMES),
             help="Choose the best method based on your PDF type"
         )
     
     with col2:
         st.markdown("### Method Info")
         method_descriptions = {
+            "Auto-select": "Times each method on sample pages and uses the fastest with clean output",
             "PyMuPDF": "Fast extraction for PDFs with embedded text",
+            "PyMuPDF (Layout)": "Embedded text in reading order for multi-column pages",
             "pdfminer.six": "Advanced extraction for complex PDFs",
-            "Tesseract OCR": "OCR for scanned PDFs and images"
+            "Tesseract OCR": "OCR for scanned PDFs and images",
+            "Hybrid/Auto": "Embedded text where available, OCR only for scanned pages"
         }
         st.info(method_descriptions[method])
     
@@ -112,33 +210,187 @@ def pdf_to_text_ui():
         col1, col2 = st.columns(2)
         
         with col1:
-            extract_button = st.button("🚀 Extract Text", type="primary")
+            quick_preview = st.checkbox(
+                "⚡ Quick preview",
+                help=f"Extract only the first {QUICK_PREVIEW_PAGES} pages"
+            )
+            strip_running = st.checkbox(
+                "🧹 Remove headers/footers",
+                help="Drop running titles and page numbers repeated on nearby pages"
+            )
+        
+        with col2:
+            page_selection = st.text_input(
+                "Pages (optional)",
+                placeholder="e.g. 1-5,10,20- or */10 for every 10th page",
+                disabled=quick_preview
+            )
+            auto_repair = st.checkbox(
+                "🔧 Auto-repair",
+                help="Join hyphenated words, merge wrapped lines into paragraphs and collapse extra whitespace"
+            )
+        
+        pages = QUICK_PREVIEW_PAGES if quick_preview else (page_selection.strip() or None)
+        
+        output_format = st.radio(
+            "Output format",
+            PDF_OUTPUT_FORMATS,
+            horizontal=True,
+            help="JSON Lines writes one record per page with method, offset, "
+                 "character count and extraction time"
+        )
+        
+        extract_button = st.button("🚀 Extract Text", type="primary")
         
         if extract_button:
             with st.spinner(f"Extracting text using {method}..."):
+                pdf_path = None
                 try:
                     extracted_text = None
+                    jsonl_summary = None
+                    cache = get_extraction_cache() if st.session_state.get('use_cache', True) else None
+                    page_cache = get_page_cache() if cache is not None else None
+                    ocr_stats = {}
                     
-                    if method == "PyMuPDF":
-                        pdf_bytes = uploaded_file.read()
-                        extracted_text = pdf_utils.extract_text_pymupdf(pdf_bytes)
-                        uploaded_file.seek(0)  # Reset file pointer
+                    # Spool the upload to disk once; every backend opens it by path
+                    pdf_path = pdf_utils.spool_to_disk(uploaded_file)
                     
-                    elif method == "pdfminer.six":
-                        # Save temporarily for pdfminer
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                            tmp_file.write(uploaded_file.read())
-                            tmp_path = tmp_file.name
+                    if output_format == "JSON Lines (.jsonl)":
+                        jsonl_summary = export_pages_jsonl(
+                            pdf_path,
+                            PDF_METHOD_NAMES[method],
+                            pages,
+                            os.path.splitext(uploaded_file.name)[0] + ".jsonl",
+                            page_cache=page_cache,
+                            ocr_stats=ocr_stats,
+                            strip_running=strip_running
+                        )
+                    
+                    elif method == "Auto-select":
+                        extracted_text, decision = pdf_utils.extract_text_auto(
+                            pdf_path,
+                            st.session_state.get('tesseract_path', '/usr/local/bin/tesseract'),
+                            dpi=st.session_state.get('ocr_dpi', 200),
+                            workers=st.session_state.get('workers', 1),
+                            cache=cache,
+                            pages=pages,
+                            ocr_engine=st.session_state.get('ocr_engine', 'auto'),
+                            page_cache=page_cache,
+                            ocr_stats=ocr_stats,
+                            strip_running=strip_running
+                        )
                         
-                        extracted_text = pdf_utils.extract_text_pdfminer_six(tmp_path)
-                        os.unlink(tmp_path)
-                        uploaded_file.seek(0)
+                        source_note = "probed just now" if decision['probed'] else "reused for this source"
+                        st.info(f"🤖 Selected backend: {decision['method']} ({source_note})")
+                        with st.expander("⏱️ Backend Probe Results"):
+                            st.caption(f"Source: {decision['source']}")
+                            st.dataframe(decision['probes'], use_container_width=True)
+                    
+                    elif method == "PyMuPDF":
+                        def stream_pymupdf():
+                            text_pages = pdf_utils.iter_pages_pymupdf(
+                                pdf_path, workers=st.session_state.get('workers', 1), pages=pages
+                            )
+                            if strip_running:
+                                text_pages = pdf_utils.strip_running_lines(text_pages)
+                            page_texts = render_page_stream(
+                                text_pages,
+                                len(pdf_utils.select_pages(pages, pdf_utils.get_page_count(pdf_path)))
+                            )
+                            return "".join(page_texts)
+                        
+                        if cache is not None:
+                            extracted_text = cache.get_or_compute(
+                                pdf_utils.cache_key(cache, pdf_path, 'pymupdf', pages=pages,
+                                                    strip_running=strip_running),
+                                stream_pymupdf
+                            )
+                        else:
+                            extracted_text = stream_pymupdf()
+                    
+                    elif method == "PyMuPDF (Layout)":
+                        extracted_text = pdf_utils.extract_text_layout(
+                            pdf_path,
+                            cache=cache,
+                            pages=pages,
+                            strip_running=strip_running
+                        )
+                    
+                    elif method == "pdfminer.six":
+                        extracted_text = pdf_utils.extract_text_pdfminer_six(
+                            pdf_path,
+                            workers=st.session_state.get('workers', 1),
+                            cache=cache,
+                            pages=pages,
+                            strip_running=strip_running
+                        )
                     
                     elif method == "Tesseract OCR":
-                        pdf_bytes = uploaded_file.read()
                         tesseract_path = st.session_state.get('tesseract_path', '/usr/local/bin/tesseract')
-                        extracted_text = pdf_utils.extract_text_tesseract(pdf_bytes, tesseract_path)
-                        uploaded_file.seek(0)
+                        ocr_dpi = st.session_state.get('ocr_dpi', 200)
+                        
+                        def stream_tesseract():
+                            ocr_pages = pdf_utils.iter_pages_tesseract(
+                                pdf_path,
+                                tesseract_path,
+                                dpi=ocr_dpi,
+                                workers=st.session_state.get('workers', 1),
+                                pages=pages,
+                                ocr_engine=st.session_state.get('ocr_engine', 'auto'),
+                                page_cache=page_cache,
+                                ocr_stats=ocr_stats
+                            )
+                            if strip_running:
+                                ocr_pages = pdf_utils.strip_running_lines(ocr_pages)
+                            page_texts = render_page_stream(
+                                ocr_pages,
+                                len(pdf_utils.select_pages(pages, pdf_utils.get_page_count(pdf_path)))
+                            )
+                            return "\n".join(page_texts)
+                        
+                        if cache is not None:
+                            extracted_text = cache.get_or_compute(
+                                pdf_utils.cache_key(
+                                    cache, pdf_path, 'tesseract', tesseract_path,
+                                    dpi=ocr_dpi, pages=pages,
+                                    ocr_engine=st.session_state.get('ocr_engine', 'auto'),
+                                    strip_running=strip_running
+                                ),
+                                stream_tesseract
+                            )
+                        else:
+                            extracted_text = stream_tesseract()
+                    
+                    elif method == "Hybrid/Auto":
+                        tesseract_path = st.session_state.get('tesseract_path', '/usr/local/bin/tesseract')
+                        page_report = pdf_utils.classify_pages(pdf_path, pages=pages)
+                        hybrid_pages = pdf_utils.iter_pages_hybrid(
+                            pdf_path,
+                            tesseract_path,
+                            dpi=st.session_state.get('ocr_dpi', 200),
+                            workers=st.session_state.get('workers', 1),
+                            report=page_report,
+                            ocr_engine=st.session_state.get('ocr_engine', 'auto'),
+                            page_cache=page_cache,
+                            ocr_stats=ocr_stats
+                        )
+                        if strip_running:
+                            hybrid_pages = pdf_utils.strip_running_lines(hybrid_pages)
+                        page_texts = render_page_stream(hybrid_pages, len(page_report))
+                        extracted_text = "".join(page_texts)
+                        
+                        ocr_count = sum(entry['method'] == 'ocr' for entry in page_report)
+                        with st.expander(f"🧭 Page Report ({ocr_count} of {len(page_report)} pages OCR'd)"):
+                            st.dataframe(page_report, use_container_width=True)
+                    
+                    if ocr_stats.get('pages'):
+                        st.caption(
+                            f"OCR page cache: {ocr_stats['cache_hits']} of {ocr_stats['pages']} "
+                            f"pages reused ({ocr_stats['hit_rate']:.0%})"
+                        )
+                    
+                    if extracted_text and auto_repair:
+                        extracted_text = pdf_utils.repair_text(extracted_text)
                     
                     if extracted_text:
                         st.success("✅ Text extraction successful!")
@@ -165,11 +417,18 @@ def pdf_to_text_ui():
                             file_name=text_filename,
                             mime="text/plain"
                         )
-                    else:
+                    elif jsonl_summary is None:
                         st.error("❌ No text could be extracted")
                 
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
+                finally:
+                    # Cleanup spooled upload
+                    if pdf_path and os.path.exists(pdf_path):
+                        try:
+                            os.unlink(pdf_path)
+                        except OSError:
+                            pass  # File already deleted
     
     # Text verification tool
     st.markdown("---")
@@ -188,26 +447,126 @@ def pdf_to_text_ui():
                     st.warning("Issues found:")
                     for issue in issues:
                         st.write(f"• {issue}")
+                    
+                    stats = pdf_utils.scan_text([file_text])
+                    with st.expander("📊 Issue Details"):
+                        st.dataframe([
+                            {
+                                'issue': name,
+                                'count': detail['count'],
+                                'first offsets': ", ".join(str(offset) for offset in detail['samples'])
+                            }
+                            for name, detail in stats['issues'].items() if detail['count']
+                        ])
                 else:
                     st.success("✅ No issues found in the text!")
             except Exception as e:
                 st.error(f"Error verifying text: {str(e)}")
 
 
+def render_page_stream(pages, page_count):
+    """
+    Show extracted pages progressively and collect their text.
+    
+    Args:
+        pages: Iterable of (page_number, text) tuples
+        page_count: Total number of pages, used for the progress bar
+        
+    Returns:
+        List of page texts in document order
+    """
+    progress = st.progress(0.0, text="Starting extraction...")
+    live_preview = st.empty()
+    page_texts = []
+    
+    for done, (page_number, page_text) in enumerate(pages, 1):
+        page_texts.append(page_text)
+        progress.progress(
+            min(done / max(page_count, 1), 1.0),
+            text=f"Extracted {done} of {page_count} pages (page {page_number})"
+        )
+        live_preview.text(f"--- Page {page_number} ---\n{page_text[:2000]}")
+    
+    progress.empty()
+    live_preview.empty()
+    return page_texts
+
+
+def export_pages_jsonl(pdf_path, method, pages, file_name, page_cache=None,
+                       ocr_stats=None, strip_running=False):
+    """
+    Extract a PDF into a JSONL file page by page and offer it for download.
+    
+    Args:
+        pdf_path: Path to the spooled PDF
+        method: pdf_utils method name, see PDF_METHOD_NAMES
+        pages: Page selection, see pdf_utils.select_pages
+        file_name: Download file name
+        page_cache: Optional per-page OCR cache
+        ocr_stats: Optional dict updated with the OCR page cache hit rate
+        strip_running: Remove running headers and footers
+        
+    Returns:
+        Summary dict from pdf_utils.write_pages_jsonl
+    """
+    page_count = len(pdf_utils.select_pages(pages, pdf_utils.get_page_count(pdf_path)))
+    progress = st.progress(0.0, text="Starting extraction...")
+    page_table = []
+    
+    def show_progress(record):
+        page_table.append({key: record[key] for key in ('page', 'method', 'offset', 'chars', 'seconds')})
+        progress.progress(
+            min(len(page_table) / max(page_count, 1), 1.0),
+            text=f"Extracted {len(page_table)} of {page_count} pages (page {record['page']})"
+        )
+    
+    fd, jsonl_path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    try:
+        records = pdf_utils.iter_page_records(
+            pdf_path,
+            method,
+            st.session_state.get('tesseract_path', '/usr/local/bin/tesseract'),
+            dpi=st.session_state.get('ocr_dpi', 200),
+            workers=st.session_state.get('workers', 1),
+            pages=pages,
+            ocr_engine=st.session_state.get('ocr_engine', 'auto'),
+            page_cache=page_cache,
+            ocr_stats=ocr_stats,
+            strip_running=strip_running
+        )
+        summary = pdf_utils.write_pages_jsonl(records, jsonl_path, progress=show_progress)
+        progress.empty()
+        
+        st.success(
+            f"✅ Extracted {summary['pages']} pages ({summary['chars']:,} characters) "
+            f"in {summary['seconds']:.2f}s"
+        )
+        with st.expander("📑 Page Records"):
+            st.dataframe(page_table, use_container_width=True)
+        with open(jsonl_path, 'rb') as f:
+            st.download_button(
+                label=f"💾 Download as {file_name}",
+                data=f.read(),
+                file_name=file_name,
+                mime="application/jsonl"
+            )
+        return summary
+    finally:
+        if os.path.exists(jsonl_path):
+            os.unlink(jsonl_path)
+
+
 def epub_converter_ui():
     """EPUB conversion interface."""
     st.header("📖 EPUB Converter")
     st.markdown("Convert EPUB files to various formats")
     
-    # Conversion type selection
-    conversion_type = st.selectbox(
-        "Select Conversion Type",
-        [
-            "EPUB to HTML",
-            "EPUB to Clean Text",
-            "EPUB to Styled PDF",
-            "EPUB to Word (.docx)"
-        ]
+    # Output format selection; all chosen formats share one parse of the book
+    conversion_types = st.multiselect(
+        "Select Conversion Types",
+        list(EPUB_CONVERSIONS),
+        default=["EPUB to Clean Text"]
     )
     
     # File upload
@@ -216,22 +575,38 @@ def epub_converter_ui():
     if uploaded_file:
         st.success(f"File '{uploaded_file.name}' uploaded successfully")
         
-        convert_button = st.button("🔄 Convert", type="primary")
+        convert_button = st.button("🔄 Convert", type="primary", disabled=not conversion_types)
         
         if convert_button:
             with st.spinner("Converting EPUB..."):
                 tmp_path = None
+                pdf_path = None
                 try:
                     # Save temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.epub') as tmp_file:
-                        tmp_file.write(uploaded_file.read())
-                        tmp_path = tmp_file.name
+                    tmp_path = pdf_utils.spool_to_disk(uploaded_file, suffix='.epub')
+                    formats = [EPUB_CONVERSIONS[conversion_type] for conversion_type in conversion_types]
+                    
+                    # The PDF is streamed to disk page by page rather than built in memory
+                    output_paths = {}
+                    if 'pdf' in formats:
+                        fd, pdf_path = tempfile.mkstemp(suffix='.pdf')
+                        os.close(fd)
+                        output_paths['pdf'] = pdf_path
                     
                     base_name = os.path.splitext(uploaded_file.name)[0]
+                    use_cache = st.session_state.get('use_cache', True)
+                    outputs = epub_utils.convert_epub(
+                        tmp_path,
+                        formats,
+                        cache=get_extraction_cache() if use_cache else None,
+                        workers=st.session_state.get('workers', 1),
+                        output_paths=output_paths,
+                        chapter_cache=get_chapter_cache() if use_cache else None
+                    )
+                    st.success("✅ Conversion successful!")
                     
-                    if conversion_type == "EPUB to HTML":
-                        html_content = epub_utils.epub_to_html(tmp_path)
-                        st.success("✅ Conversion successful!")
+                    if 'html' in outputs:
+                        html_content = outputs['html']
                         st.text_area("HTML Content (preview)", html_content[:1000] + "...", height=200)
                         st.download_button(
                             label="💾 Download HTML",
@@ -240,9 +615,8 @@ def epub_converter_ui():
                             mime="text/html"
                         )
                     
-                    elif conversion_type == "EPUB to Clean Text":
-                        text_content = epub_utils.epub_to_clean_text(tmp_path)
-                        st.success("✅ Conversion successful!")
+                    if 'text' in outputs:
+                        text_content = outputs['text']
                         st.text_area("Text Content (preview)", text_content[:1000] + "...", height=200)
                         st.download_button(
                             label="💾 Download Text",
@@ -251,24 +625,19 @@ def epub_converter_ui():
                             mime="text/plain"
                         )
                     
-                    elif conversion_type == "EPUB to Styled PDF":
-                        text_content = epub_utils.epub_to_clean_text(tmp_path)
-                        pdf_buffer = epub_utils.text_to_styled_pdf(text_content)
-                        st.success("✅ Conversion successful!")
-                        st.download_button(
-                            label="💾 Download PDF",
-                            data=pdf_buffer,
-                            file_name=f"{base_name}.pdf",
-                            mime="application/pdf"
-                        )
+                    if 'pdf' in outputs:
+                        with open(outputs['pdf'], 'rb') as pdf_file:
+                            st.download_button(
+                                label="💾 Download PDF",
+                                data=pdf_file,
+                                file_name=f"{base_name}.pdf",
+                                mime="application/pdf"
+                            )
                     
-                    elif conversion_type == "EPUB to Word (.docx)":
-                        text_content = epub_utils.epub_to_clean_text(tmp_path)
-                        word_buffer = epub_utils.text_to_word_doc(text_content)
-                        st.success("✅ Conversion successful!")
+                    if 'docx' in outputs:
                         st.download_button(
                             label="💾 Download Word Document",
-                            data=word_buffer,
+                            data=outputs['docx'],
                             file_name=f"{base_name}.docx",
                             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
                         )
@@ -276,12 +645,13 @@ def epub_converter_ui():
                 except (IOError, OSError, ValueError, RuntimeError) as e:
                     st.error(f"❌ Error: {str(e)}")
                 finally:
-                    # Cleanup temporary file
-                    if tmp_path and os.path.exists(tmp_path):
-                        try:
-                            os.unlink(tmp_path)
-                        except OSError:
-                            pass  # File already deleted
+                    # Cleanup temporary files
+                    for path in (tmp_path, pdf_path):
+                        if path and os.path.exists(path):
+                            try:
+                                os.unlink(path)
+                            except OSError:
+                                pass  # File already deleted
 
 
 def file_merger_ui():
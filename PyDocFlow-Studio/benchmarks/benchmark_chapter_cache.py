@@ -0,0 +1,93 @@
+"""
+EPUB Chapter Cache Benchmark
+Times epub_to_clean_text() on a revised edition of a book with and without
+the per-chapter text cache, and checks that the cached conversion gives the
+same text as a full one.
+
+Usage:
+    python benchmarks/benchmark_chapter_cache.py [path/to/book.epub] --chapters 300 --revised 5
+
+Without an EPUB argument a synthetic book is generated. The revised edition
+is a copy of the book with --revised chapters edited.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_epub_readers import build_sample_epub
+from utils import cache_utils, epub_utils
+
+
+def revise_epub(source_path, output_path, revised):
+    """
+    Copy an EPUB, editing the first paragraph of evenly spaced chapters.
+
+    Args:
+        source_path: Original EPUB path
+        output_path: Revised EPUB path
+        revised: Number of chapters to edit
+
+    Returns:
+        Number of chapters edited
+    """
+    with zipfile.ZipFile(source_path) as archive:
+        chapters = epub_utils.EpubDocument(source_path).items
+        step = max(1, len(chapters) // max(revised, 1))
+        edited = set(chapters[::step][:revised])
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as revision:
+            for info in archive.infolist():
+                data = archive.read(info)
+                if info.filename in edited:
+                    data = data.replace(b'<p>', b'<p>Revised edition. ', 1)
+                revision.writestr(info, data)
+    return len(edited)
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("epub", nargs="?", help="EPUB file (default: generate one)")
+    parser.add_argument("--chapters", type=int, default=300, help="Chapters in the generated book")
+    parser.add_argument("--revised", type=int, default=5, help="Chapters edited in the new edition")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for parsing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        epub_path = args.epub
+        if epub_path is None:
+            epub_path = os.path.join(work_dir, 'book.epub')
+            build_sample_epub(epub_path, args.chapters, 0)
+        revised_path = os.path.join(work_dir, 'revised.epub')
+        edited = revise_epub(epub_path, revised_path, args.revised)
+        cache = cache_utils.open_chapter_cache(os.path.join(work_dir, 'chapters'))
+
+        full, full_seconds = timed(epub_utils.epub_to_clean_text, revised_path, workers=args.workers)
+        _, cold_seconds = timed(epub_utils.epub_to_clean_text, epub_path, workers=args.workers,
+                                chapter_cache=cache)
+        hits, misses = cache.hits, cache.misses
+        cached, cached_seconds = timed(epub_utils.epub_to_clean_text, revised_path,
+                                       workers=args.workers, chapter_cache=cache)
+
+        print(f"EPUB: {epub_path} ({edited} chapters revised)")
+        print(f"{'Conversion':<28} {'seconds':>9}")
+        print(f"{'full, no cache':<28} {full_seconds:>9.2f}")
+        print(f"{'first edition, cold cache':<28} {cold_seconds:>9.2f}")
+        print(f"{'revised edition, cached':<28} {cached_seconds:>9.2f}")
+        print(f"Chapters reused: {cache.hits - hits}, reparsed: {cache.misses - misses}")
+        print("Same text as full conversion:", cached == full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+EPUB Reader Benchmark
+Compares time and peak Python memory of the zipfile and ebooklib readers
+for epub_to_clean_text(), and checks that both give the same text.
+
+Usage:
+    python benchmarks/benchmark_epub_readers.py [path/to/book.epub] --chapters 200 --image-mb 100
+
+Without an EPUB argument a synthetic image-heavy book is generated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebooklib import epub
+
+from utils import epub_utils
+
+PARAGRAPH = (
+    "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et <em>dolore magna</em> aliqua.</p>\n"
+)
+
+
+def build_sample_epub(path, chapters, image_mb):
+    """
+    Write a synthetic EPUB with text chapters and large images.
+
+    Args:
+        path: Output EPUB path
+        chapters: Number of chapters
+        image_mb: Total size of the (incompressible) images in megabytes
+    """
+    book = epub.EpubBook()
+    book.set_identifier('benchmark-book')
+    book.set_title('Benchmark Book')
+    book.set_language('en')
+
+    spine = ['nav']
+    image_size = image_mb * 1024 * 1024 // max(chapters, 1)
+    for number in range(1, chapters + 1):
+        image = epub.EpubImage(uid=f'image{number}', file_name=f'images/{number}.jpg',
+                               media_type='image/jpeg', content=os.urandom(image_size))
+        chapter = epub.EpubHtml(title=f'Chapter {number}', file_name=f'chapter{number}.xhtml')
+        chapter.content = (f"<h1>Chapter {number}</h1><img src='images/{number}.jpg'/>"
+                           + PARAGRAPH * 200)
+        book.add_item(image)
+        book.add_item(chapter)
+        spine.append(chapter)
+
+    book.toc = spine[1:]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = spine
+    epub.write_epub(path, book)
+
+
+def measure(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds, peak traced MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("epub", nargs="?", help="EPUB file to benchmark (default: synthetic)")
+    parser.add_argument("--chapters", type=int, default=200, help="Chapters in the synthetic book")
+    parser.add_argument("--image-mb", type=int, default=100, help="Image data in the synthetic book")
+    args = parser.parse_args()
+
+    epub_path = args.epub
+    temp_file = None
+    if not epub_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.epub') as tmp:
+            temp_file = epub_path = tmp.name
+        build_sample_epub(epub_path, args.chapters, args.image_mb)
+
+    try:
+        size_mb = os.path.getsize(epub_path) / (1024 * 1024)
+        print(f"Book: {epub_path} ({size_mb:.1f} MB)")
+        print(f"{'Reader':<10} {'seconds':>9} {'peak MB':>9}")
+
+        texts = {}
+        for reader in epub_utils.EPUB_READERS:
+            texts[reader], elapsed, peak = measure(epub_utils.epub_to_clean_text, epub_path,
+                                                   reader=reader)
+            print(f"{reader:<10} {elapsed:>9.2f} {peak:>9.1f}")
+
+        same = len(set(texts.values())) == 1
+        print(f"\nSame text from every reader: {'yes' if same else 'NO'}")
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+EPUB Text Backend Benchmark
+Checks every HTML-to-text backend against BeautifulSoup on an equivalence
+corpus, then measures throughput on chapter HTML.
+
+Usage:
+    python benchmarks/benchmark_epub_text.py [book.epub ...] --random 2000 --chapters 50
+
+The corpus is a set of hand-written edge cases plus seeded random markup,
+both passed through the same body extraction the EPUB readers use. Chapters
+of any EPUB files given are added to the corpus and used for the timing run;
+otherwise a synthetic chapter is timed. Exits with status 1 on a mismatch.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import epub_utils
+
+# Hand-written bodies covering entities, whitespace runs, hidden and
+# whitespace-preserving elements, comments, attributes and namespaces
+EDGE_CASES = [
+    '<h1>Title</h1><p>Para &amp; more &lt;tag&gt; café — done</p>',
+    '<p>a<br/>b<br>c</p><hr/><p>d</p>',
+    '<div>  lead   <span>inner</span>  trail </div>\n\n<p>\n  x\n</p>',
+    '<p>x<script type="text/javascript">var a = 1 < 2 && b;</script>y</p><style>p { color: red }</style>',
+    '<p>before<!-- a comment -->after</p>',
+    '<p title="a > b">quoted attr</p><p data-x=\'1>2\'>single</p>',
+    '<table><tr><td>1</td><td>2</td></tr><tr><td>3</td></tr></table>',
+    '<ul><li>one<li>two</ul><p>unclosed<p>para',
+    '<p>nbsp&nbsp;here &#169; &#x2603; &#13;</p>',
+    '<svg xmlns="http://www.w3.org/2000/svg"><title>svg title</title><text>svg text</text></svg>',
+    '<p epub:type="footnote">ns attr</p><aside epub:type="note">note</aside>',
+    '<pre>  keep\n    indent\n</pre><code>x &lt; y</code>',
+    '<pre><b>a</b>    <b>b</b>\n   <i>c</i></pre>',
+    '<p>unknown &notanentity; and bare & ampersand</p>',
+    '<p>Write &amp;lt;p&amp;gt; for a paragraph; AT&amp;T &amp;amp; co. &amp;#38; &amp;reg;x</p>',
+    '<template><p>hidden</p></template><noscript>ns</noscript><p>shown</p>',
+    '<p>\r\nwindows\r\nlines\r\n</p>',
+    '<div><div><div>deep</div></div>tail</div>',
+    'just text, no markup',
+    '<img src="a.jpg" alt="alt text"/><p>after image</p>',
+    '<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp>字<rt>ji</rt></ruby>',
+    '<p>mixed <b>bold <i>both</i></b> <a href="#n1">link</a>.</p>',
+    '<SCRIPT>upper</SCRIPT><P>Upper</P>',
+    '<textarea>raw <b>x</b></textarea><title>inline title</title>',
+    '',
+]
+
+RANDOM_TAGS = ['p', 'div', 'span', 'b', 'i', 'em', 'a', 'pre', 'script', 'style', 'template',
+               'rt', 'rp', 'ruby', 'br', 'img', 'table', 'tr', 'td', 'ul', 'li', 'h2',
+               'textarea', 'sup', 'section']
+RANDOM_ATTRIBUTES = ['', ' class="c"', ' title="a&gt;b"', ' epub:type="x"']
+RANDOM_TEXT = ['word', ' ', '  ', '\n', '\n  ', '&amp;', '&lt;', '&#13;', '&nbsp;', 'é',
+               '—', 'x y', '\t', '&#160;', '<!--c-->', '&quot;', "'", '&amp;lt;p&amp;gt;',
+               '&amp;amp;', '&amp;#38;']
+
+PARAGRAPH = (
+    "<p>Lorem ipsum dolor sit amet, consectetur <em>adipiscing</em> elit, sed do "
+    "eiusmod &amp; tempor <a href='#n1'>incididunt</a> ut labore et dolore.</p>\n"
+)
+
+
+def random_body(rng, depth=0):
+    """Return random nested markup."""
+    parts = []
+    for _ in range(rng.randint(0, 5)):
+        if depth < 5 and rng.random() < 0.5:
+            tag = rng.choice(RANDOM_TAGS)
+            parts.append(f'<{tag}{rng.choice(RANDOM_ATTRIBUTES)}>{random_body(rng, depth + 1)}</{tag}>')
+        else:
+            parts.append(rng.choice(RANDOM_TEXT))
+    return ''.join(parts)
+
+
+def as_chapter(body):
+    """Wrap a body in an XHTML document and return its body HTML as the readers do."""
+    document = ('<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+                '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+                f'<head><title>t</title></head><body>{body}</body></html>')
+    return epub_utils._body_content(document.encode('utf-8')).decode('utf-8')
+
+
+def build_corpus(epub_paths, random_count, seed):
+    """Return the list of chapter HTML strings to compare."""
+    rng = random.Random(seed)
+    corpus = [as_chapter(body) for body in EDGE_CASES]
+    corpus.extend(as_chapter(random_body(rng)) for _ in range(random_count))
+    for path in epub_paths:
+        document = epub_utils.EpubDocument(path)
+        corpus.extend(document.chapter_html(index) for index in range(len(document)))
+    return corpus
+
+
+def check_backends(corpus):
+    """Compare every backend with 'bs4' and return the number of mismatches."""
+    reference = [epub_utils.html_to_text(content, 'bs4') for content in corpus]
+    mismatches = 0
+    for backend in epub_utils.TEXT_BACKENDS:
+        failed = [index for index, content in enumerate(corpus)
+                  if epub_utils.html_to_text(content, backend) != reference[index]]
+        mismatches += len(failed)
+        status = "ok" if not failed else f"{len(failed)} mismatches, first at #{failed[0]}"
+        print(f"{backend:<8} {len(corpus)} chapters: {status}")
+    return mismatches
+
+
+def time_backends(chapters, repeat):
+    """Print the throughput of every backend on the given chapters."""
+    size = sum(len(content) for content in chapters) * repeat
+    print(f"\n{'Backend':<8} {'seconds':>9} {'MB/s':>8}")
+    for backend in epub_utils.TEXT_BACKENDS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for content in chapters:
+                epub_utils.html_to_text(content, backend)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:<8} {elapsed:>9.2f} {size / elapsed / (1024 * 1024):>8.1f}")
+
+
+def main():
+    """Run the equivalence check and the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("epubs", nargs="*", help="EPUB files to add to the corpus and time")
+    parser.add_argument("--random", type=int, default=2000, help="Random documents in the corpus")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the random documents")
+    parser.add_argument("--chapters", type=int, default=50, help="Synthetic chapters to time")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    args = parser.parse_args()
+
+    mismatches = check_backends(build_corpus(args.epubs, args.random, args.seed))
+
+    if args.epubs:
+        chapters = []
+        for path in args.epubs:
+            document = epub_utils.EpubDocument(path)
+            chapters.extend(document.chapter_html(index) for index in range(len(document)))
+    else:
+        chapter = as_chapter(f"<h1>Chapter</h1>{PARAGRAPH * 400}<pre>code  sample</pre>")
+        chapters = [chapter] * args.chapters
+    time_backends(chapters, args.repeat)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Line Breaking Benchmark
+Compares textwrap's character-count wrapping with font-metric wrapping on a
+full novel: time, line count, and how well the lines fit the text width.
+
+Usage:
+    python benchmarks/benchmark_line_breaking.py [novel.txt] --words 150000
+
+Without a text file a synthetic novel with a natural word distribution is
+generated.
+"""
+import argparse
+import os
+import random
+import sys
+import textwrap
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import render_utils
+
+# Character width the styled PDF used before metric wrapping
+TEXTWRAP_WIDTH = 85
+
+
+def build_sample_novel(words, seed=1):
+    """
+    Return synthetic novel text: paragraphs of Zipf-distributed words.
+
+    Args:
+        words: Approximate number of words
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    vocabulary = [
+        ''.join(rng.choice(letters[:12 + length]) for _ in range(length))
+        for length in (rng.choice((1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 7, 8, 9, 11, 13)) for _ in range(20000))
+    ]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    paragraphs = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(5, 180))
+        sentence = rng.choices(vocabulary, weights, k=length)
+        sentence[0] = sentence[0].capitalize()
+        paragraphs.append(' '.join(sentence) + '.')
+        remaining -= length
+    return '\n'.join(paragraphs)
+
+
+def measure(name, wrap, paragraphs, font, line_width):
+    """Wrap every paragraph, then print time and fit statistics."""
+    start = time.perf_counter()
+    lines = [line for paragraph in paragraphs for line in wrap(paragraph)]
+    elapsed = time.perf_counter() - start
+
+    widths = [font.text_width(line, render_utils.PDF_FONT_SIZE) for line in lines]
+    overflowing = sum(width > line_width + 0.01 for width in widths)
+    fill = sum(min(width, line_width) for width in widths) / (len(widths) * line_width) if widths else 0
+    print(f"{name:<14} {elapsed:>9.2f} {len(lines):>9} {overflowing:>12} {fill:>9.1%}")
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("text", nargs="?", help="UTF-8 text file, one paragraph per line")
+    parser.add_argument("--words", type=int, default=150000, help="Words in the synthetic novel")
+    parser.add_argument("--font", default="DejaVuSerif.ttf", help="TrueType font path or name")
+    args = parser.parse_args()
+
+    if args.text:
+        with open(args.text, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = build_sample_novel(args.words)
+    paragraphs = text.split('\n')
+
+    font = render_utils.load_font(args.font)
+    page_width, _ = render_utils.PDF_PAGE_SIZE
+    line_width = page_width - 2 * render_utils.PDF_MARGIN
+    print(f"Text: {len(text) / (1024 * 1024):.1f} MB, {len(paragraphs)} paragraphs; "
+          f"font {font.name}, {line_width:.0f} pt lines")
+    print(f"{'Wrapper':<14} {'seconds':>9} {'lines':>9} {'overflowing':>12} {'fill':>9}")
+
+    measure("textwrap", lambda paragraph: textwrap.wrap(paragraph, width=TEXTWRAP_WIDTH),
+            paragraphs, font, line_width)
+    measure("metric", lambda paragraph: render_utils.wrap_paragraph(paragraph, font, line_width),
+            paragraphs, font, line_width)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+OCR Engine Benchmark
+Compares the per-page tesseract process path with persistent OCR engines.
+
+Usage:
+    python benchmarks/benchmark_ocr_engines.py [path/to/scan.pdf] --pages 50 --workers 4
+
+Without a PDF argument a synthetic scanned (image-only) document is generated.
+Requires tesseract and poppler; tesserocr is benchmarked when installed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from utils import ocr_utils
+from utils import pdf_utils
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+def build_scanned_pdf(path, pages):
+    """
+    Write a synthetic image-only PDF, as produced by a scanner.
+
+    Args:
+        path: Output PDF path
+        pages: Number of pages to generate
+    """
+    with fitz.open() as text_document, fitz.open() as scanned_document:
+        for page_num in range(pages):
+            page = text_document.new_page()
+            body = f"Page {page_num + 1}\n" + (LOREM * 12)
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), body, fontsize=11)
+
+            pixmap = page.get_pixmap(dpi=150)
+            scanned_page = scanned_document.new_page(width=page.rect.width, height=page.rect.height)
+            scanned_page.insert_image(scanned_page.rect, pixmap=pixmap)
+        scanned_document.save(path)
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a timing table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="Scanned PDF to benchmark (default: synthetic)")
+    parser.add_argument("--pages", type=int, default=40, help="Pages in synthetic PDF")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--tesseract-cmd", default="/usr/local/bin/tesseract")
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    temp_file = None
+    if not pdf_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+            temp_file = pdf_path = tmp.name
+        build_scanned_pdf(pdf_path, args.pages)
+
+    try:
+        page_count = pdf_utils.get_page_count(pdf_path)
+        print(f"Document: {pdf_path} ({page_count} pages, workers={args.workers})")
+        print(f"{'Engine':<16} {'seconds':>9} {'pages/s':>9} {'speedup':>9}  output")
+
+        baseline_text = baseline_time = None
+        for engine in reversed(ocr_utils.available_engines()):
+            text, elapsed = time_call(
+                pdf_utils.extract_text_tesseract,
+                pdf_path,
+                args.tesseract_cmd,
+                dpi=args.dpi,
+                workers=args.workers,
+                ocr_engine=engine
+            )
+            if baseline_text is None:
+                baseline_text, baseline_time = text, elapsed
+            same = "identical" if text == baseline_text else "differs"
+            print(
+                f"{engine:<16} {elapsed:>9.2f} {page_count / elapsed:>9.2f} "
+                f"{baseline_time / elapsed:>8.1f}x  {same}"
+            )
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+if __name__ == "__main__":
+    main()
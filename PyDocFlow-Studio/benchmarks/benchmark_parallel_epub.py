@@ -0,0 +1,69 @@
+"""
+Parallel EPUB Benchmark
+Compares serial and multi-process chapter parsing for EPUB HTML and text.
+
+Usage:
+    python benchmarks/benchmark_parallel_epub.py [path/to/book.epub] --chapters 300 --workers 8
+
+Without an EPUB argument a synthetic omnibus edition is generated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_epub_readers import build_sample_epub
+from utils import epub_utils
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a timing table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("epub", nargs="?", help="EPUB to benchmark (default: synthetic)")
+    parser.add_argument("--chapters", type=int, default=300, help="Chapters in synthetic EPUB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    epub_path = args.epub
+    temp_file = None
+    if not epub_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.epub') as tmp:
+            temp_file = epub_path = tmp.name
+        build_sample_epub(epub_path, args.chapters, 0)
+
+    try:
+        chapters = len(epub_utils.EpubDocument(epub_path))
+        print(f"Book: {epub_path} ({chapters} chapters)")
+        print(f"{'Output':<12} {'workers=1':>12} {f'workers={args.workers}':>12} {'speedup':>9}")
+
+        conversions = [("HTML", epub_utils.epub_to_html, {})]
+        conversions.extend(
+            (f"text/{backend}", epub_utils.epub_to_clean_text, {'text_backend': backend})
+            for backend in epub_utils.TEXT_BACKENDS
+        )
+        for name, func, options in conversions:
+            serial, serial_time = time_call(func, epub_path, workers=1, **options)
+            parallel, parallel_time = time_call(func, epub_path, workers=args.workers, **options)
+            if serial != parallel:
+                print(f"{name}: parallel output differs from serial output!")
+            print(
+                f"{name:<12} {serial_time:>11.2f}s {parallel_time:>11.2f}s "
+                f"{serial_time / parallel_time:>8.1f}x"
+            )
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+if __name__ == "__main__":
+    main()
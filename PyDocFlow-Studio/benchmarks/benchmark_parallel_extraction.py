@@ -0,0 +1,92 @@
+"""
+Parallel Extraction Benchmark
+Compares serial and multi-process page extraction for PyMuPDF and pdfminer.six.
+
+Usage:
+    python benchmarks/benchmark_parallel_extraction.py [path/to/file.pdf] --workers 8
+
+Without a PDF argument a synthetic text-heavy document is generated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from utils import pdf_utils
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+def build_sample_pdf(path, pages):
+    """
+    Write a synthetic multi-page PDF with dense text.
+
+    Args:
+        path: Output PDF path
+        pages: Number of pages to generate
+    """
+    with fitz.open() as pdf_document:
+        for page_num in range(pages):
+            page = pdf_document.new_page()
+            body = f"Page {page_num + 1}\n" + (LOREM * 30)
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), body, fontsize=8)
+        pdf_document.save(path)
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a timing table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to benchmark (default: synthetic)")
+    parser.add_argument("--pages", type=int, default=400, help="Pages in synthetic PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    temp_file = None
+    if not pdf_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
+            temp_file = pdf_path = tmp.name
+        build_sample_pdf(pdf_path, args.pages)
+
+    try:
+        with open(pdf_path, 'rb') as f:
+            pdf_bytes = f.read()
+
+        print(f"Document: {pdf_path} ({pdf_utils.get_page_count(pdf_bytes)} pages)")
+        print(f"{'Backend':<12} {'workers=1':>12} {f'workers={args.workers}':>12} {'speedup':>9}")
+
+        backends = [
+            ("PyMuPDF", pdf_utils.extract_text_pymupdf, pdf_bytes),
+            ("pdfminer", pdf_utils.extract_text_pdfminer_six, pdf_path),
+        ]
+        for name, func, source in backends:
+            serial_text, serial_time = time_call(func, source, workers=1)
+            parallel_text, parallel_time = time_call(func, source, workers=args.workers)
+            if serial_text != parallel_text:
+                print(f"{name}: parallel output differs from serial output!")
+            print(
+                f"{name:<12} {serial_time:>11.2f}s {parallel_time:>11.2f}s "
+                f"{serial_time / parallel_time:>8.1f}x"
+            )
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+if __name__ == "__main__":
+    main()
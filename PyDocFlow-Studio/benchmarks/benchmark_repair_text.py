@@ -0,0 +1,91 @@
+"""
+Text Repair Benchmark
+Measures repair_text() and streaming repair_text_file() throughput in MB/s.
+
+Usage:
+    python benchmarks/benchmark_repair_text.py [path/to/file.txt] --size-mb 200
+
+Without a text file argument a synthetic extraction-like text is generated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import pdf_utils
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eius-\n"
+    "mod tempor incididunt ut labore et dolore magna aliqua.  Ut enim ad minim \n"
+    "veniam, quis nostrud exercitation ullamco\tlaboris nisi ut aliquip.\n\n\n"
+)
+
+
+def build_sample_text(path, size_mb):
+    """
+    Write a synthetic text file with hyphenated, wrapped and spaced lines.
+
+    Args:
+        path: Output text file path
+        size_mb: Approximate file size in megabytes
+    """
+    block = PARAGRAPH * 1000
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(max(1, size_mb * 1024 * 1024 // len(block.encode('utf-8')))):
+            f.write(block)
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a throughput table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("text", nargs="?", help="Text file to benchmark (default: synthetic)")
+    parser.add_argument("--size-mb", type=int, default=100, help="Size of synthetic text")
+    args = parser.parse_args()
+
+    text_path = args.text
+    temp_files = []
+    if not text_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as tmp:
+            text_path = tmp.name
+        temp_files.append(text_path)
+        build_sample_text(text_path, args.size_mb)
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as tmp:
+        output_path = tmp.name
+    temp_files.append(output_path)
+
+    try:
+        size_mb = os.path.getsize(text_path) / (1024 * 1024)
+        print(f"Document: {text_path} ({size_mb:.1f} MB)")
+
+        counts, file_time = time_call(pdf_utils.repair_text_file, text_path, output_path)
+
+        with open(text_path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        repaired, repair_time = time_call(pdf_utils.repair_text, text)
+
+        print(f"{'Function':<30} {'seconds':>9} {'MB/s':>9}")
+        print(f"{'repair_text (in memory)':<30} {repair_time:>9.2f} {size_mb / repair_time:>9.1f}")
+        print(f"{'repair_text_file (streaming)':<30} {file_time:>9.2f} {size_mb / file_time:>9.1f}")
+        print()
+        print(f"Characters: {counts['chars_in']:,} in, {counts['chars_out']:,} out")
+        print(f"Issues before: {pdf_utils.verify_text(text)}")
+        print(f"Issues after:  {pdf_utils.verify_text(repaired)}")
+    finally:
+        for path in temp_files:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Running Line Benchmark
+Measures strip_running_lines() throughput and checks what it removes on synthetic page streams.
+
+Usage:
+    python benchmarks/benchmark_running_lines.py --pages 20000
+
+Three documents are generated: a book with running heads and page-number
+footers, which should lose exactly those lines; a numeric table with four
+rows per page, which should be left unchanged; and a form whose pages
+repeat the same four lines, which must never be stripped to nothing.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import pdf_utils
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud").split()
+
+
+def body_line(page_number, line):
+    """Return a line of prose that differs from page to page in its words, not only its digits."""
+    start = (page_number * 31 + line * 7) % len(WORDS)
+    return " ".join((WORDS + WORDS)[start:start + 10])
+
+
+def book_pages(page_count, body_lines=30, chapter_pages=25):
+    """Yield (page_number, text, body) for a book with running heads and page numbers."""
+    for page_number in range(1, page_count + 1):
+        chapter = (page_number - 1) // chapter_pages + 1
+        body = [body_line(page_number, line) for line in range(body_lines)]
+        lines = [f"A Synthetic Book — Chapter {chapter}", ""] + body + ["", f"Page {page_number} of {page_count}"]
+        yield page_number, "\n".join(lines), body
+
+
+def table_pages(page_count):
+    """Yield (page_number, text, body) for a numeric table with four rows per page."""
+    for page_number in range(1, page_count + 1):
+        body = [f"{page_number * 4 + row}  {row}.{page_number % 10}  {page_number % 7}" for row in range(4)]
+        yield page_number, "\n".join(body), body
+
+
+def form_pages(page_count):
+    """Yield (page_number, text, body) for a form repeating the same four lines on every page."""
+    body = ["Applicant name", "Date of birth", "Signature", "Office use only"]
+    for page_number in range(1, page_count + 1):
+        yield page_number, "\n".join(body), body
+
+
+def run_case(pages):
+    """
+    Strip running lines from a generated document.
+
+    Args:
+        pages: Iterable of (page_number, text, body) tuples
+
+    Returns:
+        Tuple of (stats, seconds, pages whose body lost a line, empty pages)
+    """
+    bodies = {}
+
+    def stream():
+        for page_number, text, body in pages:
+            bodies[page_number] = body
+            yield page_number, text
+
+    stats = {}
+    damaged = 0
+    empty = 0
+    start = time.perf_counter()
+    for page_number, text in pdf_utils.strip_running_lines(stream(), stats=stats):
+        kept = set(text.split("\n"))
+        if not all(line in kept for line in bodies.pop(page_number)):
+            damaged += 1
+        if not text.strip():
+            empty += 1
+    return stats, time.perf_counter() - start, damaged, empty
+
+
+def main():
+    """Run the benchmark and print a table of removed lines and throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20000, help="Pages per synthetic document")
+    args = parser.parse_args()
+
+    cases = (
+        ('book (2 running lines/page)', book_pages),
+        ('numeric table (4 rows/page)', table_pages),
+        ('repeated form (4 lines/page)', form_pages),
+    )
+    print(f"{'Document':<30} {'pages':>7} {'removed':>8} {'damaged':>8} {'empty':>6} {'pages/s':>9}")
+    for name, build in cases:
+        stats, seconds, damaged, empty = run_case(build(args.pages))
+        print(f"{name:<30} {stats['pages']:>7} {stats['lines_removed']:>8} {damaged:>8} {empty:>6} "
+              f"{stats['pages'] / seconds:>9.0f}")
+    print()
+    print("removed: lines dropped; damaged: pages that lost a body line; empty: pages left blank")
+
+
+if __name__ == "__main__":
+    main()
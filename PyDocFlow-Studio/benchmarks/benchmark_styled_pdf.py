@@ -0,0 +1,53 @@
+"""
+Styled PDF Benchmark
+Measures time and peak Python memory of streaming styled PDFs to disk for
+increasing book lengths; the peak should stay flat as the book grows.
+
+Usage:
+    python benchmarks/benchmark_styled_pdf.py --paragraphs 1000 10000 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import render_utils
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+) * 5
+
+
+def main():
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Book lengths to render, in paragraphs")
+    parser.add_argument("--font", default="DejaVuSerif.ttf", help="TrueType font path or name")
+    args = parser.parse_args()
+
+    font = render_utils.load_font(args.font)  # Loaded once, outside the measurements
+    print(f"Font: {font.name}")
+    print(f"{'Paragraphs':>10} {'pages':>7} {'MB':>7} {'seconds':>9} {'peak MB':>9}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, 'book.pdf')
+        for count in args.paragraphs:
+            tracemalloc.start()
+            start = time.perf_counter()
+            summary = render_utils.write_styled_pdf((PARAGRAPH for _ in range(count)), pdf_path, args.font)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+            print(f"{count:>10} {summary['pages']:>7} {size_mb:>7.1f} {elapsed:>9.2f} "
+                  f"{peak / (1024 * 1024):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Text Verification Benchmark
+Measures verify_text() and streaming scan_text_file() throughput in MB/s.
+
+Usage:
+    python benchmarks/benchmark_verify_text.py [path/to/file.txt] --size-mb 200
+
+Without a text file argument a synthetic extraction-like text is generated.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import pdf_utils
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod\n"
+    "tempor incididunt ut labore et dolore magna aliqua.     Ut enim ad minim\n"
+    "veniam, quis nostrud exercitation ullamco � laboris nisi ut aliquip.\n\n"
+)
+
+
+def build_sample_text(path, size_mb):
+    """
+    Write a synthetic text file with a sprinkling of every issue class.
+
+    Args:
+        path: Output text file path
+        size_mb: Approximate file size in megabytes
+    """
+    block = PARAGRAPH * 1000
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(max(1, size_mb * 1024 * 1024 // len(block.encode('utf-8')))):
+            f.write(block)
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a throughput table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("text", nargs="?", help="Text file to benchmark (default: synthetic)")
+    parser.add_argument("--size-mb", type=int, default=100, help="Size of synthetic text")
+    args = parser.parse_args()
+
+    text_path = args.text
+    temp_file = None
+    if not text_path:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as tmp:
+            temp_file = text_path = tmp.name
+        build_sample_text(text_path, args.size_mb)
+
+    try:
+        size_mb = os.path.getsize(text_path) / (1024 * 1024)
+        print(f"Document: {text_path} ({size_mb:.1f} MB)")
+
+        stats, scan_time = time_call(pdf_utils.scan_text_file, text_path)
+
+        with open(text_path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        _, verify_time = time_call(pdf_utils.verify_text, text)
+
+        print(f"{'Function':<28} {'seconds':>9} {'MB/s':>9}")
+        print(f"{'verify_text (in memory)':<28} {verify_time:>9.2f} {size_mb / verify_time:>9.1f}")
+        print(f"{'scan_text_file (streaming)':<28} {scan_time:>9.2f} {size_mb / scan_time:>9.1f}")
+        print()
+        for name, detail in stats['issues'].items():
+            print(f"{name:<18} {detail['count']:>12,}  first offsets: {detail['samples'][:3]}")
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+PyDocFlow-Studio Command Line Interface
+Headless batch processing for folders of documents.
+
+Usage:
+    python cli.py pdf INPUT_FOLDER [-o OUTPUT_FOLDER] [--method pymupdf] [--workers 8] [--format txt]
+    python cli.py epub INPUT_FOLDER [-o OUTPUT_FOLDER] [--formats text html pdf] [--workers 8]
+"""
+import argparse
+import sys
+
+from utils import batch_utils
+from utils import epub_utils
+from utils import ocr_utils
+from utils import pdf_utils
+
+
+def print_record(record):
+    """Print one manifest record as a progress line."""
+    if record['status'] == 'done':
+        size = f"{record['chars']} chars" if 'chars' in record else f"{record['chapters']} chapters"
+        print(f"✅ {record['file']} ({size}, {record['seconds']:.2f}s)")
+    else:
+        print(f"❌ {record['file']}: {record['error']}", file=sys.stderr)
+
+
+def run_pdf(args):
+    """Run batch PDF to text extraction."""
+    summary = batch_utils.batch_extract_pdfs(
+        args.input_folder,
+        args.output or args.input_folder,
+        method=args.method,
+        workers=args.workers,
+        tesseract_cmd=args.tesseract_cmd,
+        dpi=args.dpi,
+        manifest_path=args.manifest,
+        progress=print_record,
+        ocr_engine=args.ocr_engine,
+        use_page_cache=not args.no_page_cache,
+        strip_running=args.strip_running,
+        output_format=args.format
+    )
+    print(
+        f"Processed {summary['total']} PDFs: {summary['done']} extracted, "
+        f"{summary['skipped']} already done, {summary['failed']} failed"
+    )
+    if summary['ocr_pages']:
+        print(
+            f"OCR page cache: {summary['ocr_cache_hits']} of {summary['ocr_pages']} pages "
+            f"reused ({summary['ocr_cache_hit_rate']:.0%})"
+        )
+    return 1 if summary['failed'] else 0
+
+
+def run_epub(args):
+    """Run batch EPUB conversion to several formats."""
+    output_folder = args.output or args.input_folder
+    summary = batch_utils.batch_convert_epubs(
+        args.input_folder,
+        output_folder,
+        formats=args.formats,
+        workers=args.workers,
+        font_path=args.font,
+        manifest_path=args.manifest,
+        progress=print_record,
+        reader=args.reader,
+        text_backend=args.text_backend,
+        use_chapter_cache=not args.no_chapter_cache
+    )
+    print(
+        f"Processed {summary['total']} EPUBs in {summary['seconds']:.1f}s: {summary['done']} converted, "
+        f"{summary['skipped']} up to date, {summary['failed']} failed"
+    )
+    print(f"Summary written to {batch_utils.EPUB_SUMMARY_NAME} in {output_folder}")
+    return 1 if summary['failed'] else 0
+
+
+def build_parser():
+    """Build the argument parser with one sub-command per batch job."""
+    parser = argparse.ArgumentParser(description="PyDocFlow-Studio batch processing")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pdf_parser = subparsers.add_parser("pdf", help="Extract text from a folder of PDFs")
+    pdf_parser.add_argument("input_folder", help="Folder containing PDF files (recursive)")
+    pdf_parser.add_argument("-o", "--output", help="Output folder (default: input folder)")
+    pdf_parser.add_argument("--method", choices=pdf_utils.PDF_METHODS, default="pymupdf")
+    pdf_parser.add_argument("--workers", type=int, help="Concurrent files (default: all CPUs)")
+    pdf_parser.add_argument("--dpi", type=int, default=200, help="OCR rasterization DPI")
+    pdf_parser.add_argument("--tesseract-cmd", default="/usr/local/bin/tesseract")
+    pdf_parser.add_argument("--ocr-engine", choices=("auto",) + ocr_utils.OCR_ENGINES,
+                            default=ocr_utils.DEFAULT_OCR_ENGINE)
+    pdf_parser.add_argument("--no-page-cache", action="store_true",
+                            help="OCR every page, even pages seen in earlier documents")
+    pdf_parser.add_argument("--format", choices=batch_utils.OUTPUT_FORMATS, default="txt",
+                            help="txt: one text file per PDF; jsonl: one record per page")
+    pdf_parser.add_argument("--strip-running", action="store_true",
+                            help="Remove repeated page headers, footers and page numbers")
+    pdf_parser.add_argument("--manifest", help="Manifest path (default: OUTPUT/manifest.jsonl)")
+    pdf_parser.set_defaults(func=run_pdf)
+
+    epub_parser = subparsers.add_parser("epub", help="Convert a folder of EPUBs to several formats")
+    epub_parser.add_argument("input_folder", help="Folder containing EPUB files (recursive)")
+    epub_parser.add_argument("-o", "--output", help="Output folder (default: input folder)")
+    epub_parser.add_argument("--formats", nargs="+", choices=tuple(batch_utils.EPUB_OUTPUT_EXTENSIONS),
+                             default=list(batch_utils.DEFAULT_EPUB_BATCH_FORMATS),
+                             help="Formats written for each book from a single parse")
+    epub_parser.add_argument("--workers", type=int, help="Concurrent books (default: all CPUs)")
+    epub_parser.add_argument("--font", default="DejaVuSerif.ttf", help="TrueType font for PDF output")
+    epub_parser.add_argument("--reader", choices=epub_utils.EPUB_READERS,
+                             default=epub_utils.DEFAULT_EPUB_READER)
+    epub_parser.add_argument("--text-backend", choices=epub_utils.TEXT_BACKENDS,
+                             default=epub_utils.DEFAULT_TEXT_BACKEND)
+    epub_parser.add_argument("--no-chapter-cache", action="store_true",
+                             help="Parse every chapter, even chapters seen in earlier editions")
+    epub_parser.add_argument("--manifest", help="Manifest path (default: OUTPUT/manifest.jsonl)")
+    epub_parser.set_defaults(func=run_epub)
+
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,12 @@ This package contains modular utilities for:
 - EPUB conversion (epub_utils)
 - File merging with metadata (file_merge_utils)
 - eBook discovery (ebook_finder_utils)
+- On-disk caching of extraction results (cache_utils)
+- OCR engines with persistent workers (ocr_utils)
+- Positioned span storage and reading order (layout_utils)
+- Streaming document writers (render_utils)
+- Worker counts and work slicing for process pools (parallel_utils)
+- Headless batch extraction and conversion of folders (batch_utils)
 """
 
-__all__ = ['pdf_utils', 'epub_utils', 'file_merge_utils', 'ebook_finder_utils']
+__all__ = ['pdf_utils', 'epub_utils', 'file_merge_utils', 'ebook_finder_utils', 'cache_utils', 'ocr_utils', 'layout_utils', 'render_utils', 'parallel_utils', 'batch_utils']
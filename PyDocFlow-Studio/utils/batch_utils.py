@@ -0,0 +1,420 @@
+"""
+Batch Utilities Module
+Contains functions for headless batch extraction and conversion over folders of documents.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from utils import cache_utils
+from utils import epub_utils
+from utils import ocr_utils
+from utils import pdf_utils
+
+# Default manifest file name, written inside the output folder
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Output formats: one .txt per PDF, or one .jsonl per PDF with a record per
+# page (see pdf_utils.iter_page_records)
+OUTPUT_FORMATS = ('txt', 'jsonl')
+
+# EPUB batch output formats (see epub_utils.EPUB_FORMATS) and the extension
+# of the file each one is written to
+EPUB_OUTPUT_EXTENSIONS = {'html': 'html', 'text': 'txt', 'pdf': 'pdf', 'docx': 'docx'}
+DEFAULT_EPUB_BATCH_FORMATS = ('text', 'html', 'pdf')
+
+# Summary of the latest EPUB batch run, written inside the output folder
+EPUB_SUMMARY_NAME = 'epub_summary.json'
+
+# Caches owned by a batch worker process, opened once by _init_pdf_worker()
+# or _init_epub_worker() since opening a cache scans its whole directory
+_worker_page_cache = None
+_worker_chapter_cache = None
+
+
+def find_files(input_folder, extension):
+    """
+    Find all files with an extension below a folder.
+    
+    Args:
+        input_folder: Folder to search recursively
+        extension: File extension including the dot (e.g. '.pdf')
+    
+    Returns:
+        Sorted list of paths relative to input_folder
+    """
+    found = []
+    for root, _, files in os.walk(input_folder):
+        for file_name in files:
+            if file_name.lower().endswith(extension):
+                found.append(os.path.relpath(os.path.join(root, file_name), input_folder))
+    return sorted(found)
+
+
+def load_manifest(manifest_path):
+    """
+    Load the latest manifest record for every file.
+    
+    Lines that cannot be parsed (e.g. cut off by a crash) are ignored.
+    
+    Args:
+        manifest_path: Path to a JSONL manifest
+    
+    Returns:
+        Dictionary mapping relative file path to its latest record
+    """
+    records = {}
+    if not os.path.exists(manifest_path):
+        return records
+    
+    with open(manifest_path, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            try:
+                record = json.loads(line)
+                records[record['file']] = record
+            except (ValueError, KeyError, TypeError):
+                continue  # Partial line from an interrupted run
+    return records
+
+
+def _source_signature(path):
+    """Return (size, mtime) used to detect changed inputs between runs."""
+    stat = os.stat(path)
+    return stat.st_size, int(stat.st_mtime)
+
+
+def _write_text_atomic(output_path, text):
+    """Write text via a temp file so an interrupted run never leaves partial output."""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    temp_path = f"{output_path}.part"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, output_path)
+
+
+def _init_pdf_worker(method, use_page_cache):
+    """Worker initializer: open the per-page OCR cache once when the method can OCR."""
+    global _worker_page_cache
+    if use_page_cache and method in pdf_utils.OCR_METHODS:
+        _worker_page_cache = cache_utils.open_page_cache()
+
+
+def _extract_pdf_job(pdf_path, output_path, method, tesseract_cmd, dpi, ocr_engine,
+                     strip_running, output_format):
+    """Worker: extract one PDF to a .txt or .jsonl file and return its manifest result fields."""
+    start = time.perf_counter()
+    ocr_stats = {}
+    page_cache = _worker_page_cache
+    
+    if output_format == 'jsonl':
+        # Pages stream into the .part file; it is renamed once complete
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        temp_path = f"{output_path}.part"
+        records = pdf_utils.iter_page_records(pdf_path, method, tesseract_cmd=tesseract_cmd,
+                                              dpi=dpi, ocr_engine=ocr_engine,
+                                              page_cache=page_cache, ocr_stats=ocr_stats,
+                                              strip_running=strip_running)
+        try:
+            summary = pdf_utils.write_pages_jsonl(records, temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, output_path)
+        chars = summary['chars']
+    else:
+        text = pdf_utils.extract_text(pdf_path, method, tesseract_cmd=tesseract_cmd, dpi=dpi,
+                                      ocr_engine=ocr_engine, page_cache=page_cache,
+                                      ocr_stats=ocr_stats, strip_running=strip_running)
+        _write_text_atomic(output_path, text)
+        chars = len(text)
+    
+    result = {'chars': chars, 'seconds': round(time.perf_counter() - start, 3)}
+    if ocr_stats.get('pages'):
+        result.update(ocr_pages=ocr_stats['pages'], ocr_cache_hits=ocr_stats['cache_hits'])
+    return result
+
+
+def _init_epub_worker(use_chapter_cache):
+    """Worker initializer: open the per-chapter text cache once."""
+    global _worker_chapter_cache
+    if use_chapter_cache:
+        _worker_chapter_cache = cache_utils.open_chapter_cache()
+
+
+def _convert_epub_job(epub_path, output_paths, font_path, reader, text_backend):
+    """Worker: convert one EPUB to every requested format and return its manifest result fields."""
+    start = time.perf_counter()
+    chapter_cache = _worker_chapter_cache
+    temp_paths = {}
+    for name, output_path in output_paths.items():
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        temp_paths[name] = f"{output_path}.part"
+    
+    # One parse feeds all formats; outputs are renamed only once all are written
+    document = epub_utils.open_epub(epub_path, reader, text_backend, chapter_cache=chapter_cache)
+    try:
+        epub_utils.convert_epub(document, tuple(output_paths), font_path, output_paths=temp_paths)
+    except BaseException:
+        for temp_path in temp_paths.values():
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    for name, output_path in output_paths.items():
+        os.replace(temp_paths[name], output_path)
+    return {'chapters': len(document), 'seconds': round(time.perf_counter() - start, 3)}
+
+
+def is_completed(record, source_path, output_paths):
+    """
+    Check whether a manifest record covers the current version of a file.
+    
+    Args:
+        record: Manifest record or None
+        source_path: Path to the input file
+        output_paths: Output paths that must all exist
+    
+    Returns:
+        True if the file was finished and has not changed since
+    """
+    if not record or record.get('status') != 'done':
+        return False
+    size, mtime = _source_signature(source_path)
+    if record.get('size') != size or record.get('mtime') != mtime:
+        return False
+    return all(os.path.exists(path) for path in output_paths)
+
+
+def _run_jobs(job_func, jobs, manifest_path, workers, progress=None,
+              initializer=None, initargs=()):
+    """
+    Run batch jobs in a process pool and append each outcome to the manifest.
+    
+    Every record is completed with the input's size and mtime, the finish
+    time and the job's status, then written and fsynced as soon as its job
+    ends, so an interrupted run keeps every finished file.
+    
+    Args:
+        job_func: Module-level worker function returning a dict of result fields
+        jobs: List of (record, source_path, args), where record holds the
+            file's manifest fields and args are passed to job_func
+        manifest_path: JSONL manifest the records are appended to
+        workers: Number of worker processes (None uses all CPUs)
+        progress: Optional callable receiving each new manifest record
+        initializer: Optional callable run once in every worker process
+        initargs: Arguments for initializer
+    
+    Returns:
+        List of the manifest records written, in completion order
+    """
+    records = []
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                initializer=initializer, initargs=initargs) as executor:
+        futures = {
+            executor.submit(job_func, *args): (record, source_path)
+            for record, source_path, args in jobs
+        }
+        for future in as_completed(futures):
+            record, source_path = futures[future]
+            size, mtime = _source_signature(source_path)
+            record.update(size=size, mtime=mtime,
+                          finished_at=datetime.now().isoformat(timespec='seconds'))
+            try:
+                record.update(status='done', **future.result())
+            except Exception as e:  # Any failure is recorded, not fatal to the batch
+                record.update(status='failed', error=f"{type(e).__name__}: {e}")
+            
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            records.append(record)
+            if progress:
+                progress(record)
+    return records
+
+
+def batch_extract_pdfs(input_folder, output_folder, method='pymupdf', workers=None,
+                       tesseract_cmd='/usr/local/bin/tesseract', dpi=200,
+                       manifest_path=None, progress=None,
+                       ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE, use_page_cache=True,
+                       strip_running=False, output_format='txt'):
+    """
+    Extract every PDF below a folder to .txt or .jsonl files, resuming earlier runs.
+    
+    Each PDF is written to the same relative path in output_folder with the
+    extension of its output format. Every finished or failed file is appended to a JSONL
+    manifest with its timing, so an interrupted run skips completed files
+    when restarted. Failed files are retried. OCR'd pages are looked up in
+    the shared per-page OCR cache, so repeated pages across the whole batch
+    (cover sheets, boilerplate, blank separators) are OCR'd only once.
+    
+    Args:
+        input_folder: Folder containing PDF files (searched recursively)
+        output_folder: Folder for outputs
+        method: One of pdf_utils.PDF_METHODS
+        workers: Number of files processed concurrently (None uses all CPUs)
+        tesseract_cmd: Path to tesseract executable, for OCR methods
+        dpi: Resolution used to rasterize pages for OCR
+        manifest_path: Manifest location (default: output_folder/manifest.jsonl)
+        progress: Optional callable receiving each new manifest record
+        ocr_engine: OCR engine name, see ocr_utils.OCR_ENGINES
+        use_page_cache: Reuse OCR results for pages seen before
+        strip_running: Remove running headers and footers, see pdf_utils.strip_running_lines
+        output_format: One of OUTPUT_FORMATS
+    
+    Returns:
+        Dictionary with total, skipped, done and failed counts, plus
+        ocr_pages, ocr_cache_hits and ocr_cache_hit_rate for this run
+    """
+    if not os.path.isdir(input_folder):
+        raise FileNotFoundError(f"Input folder not found: {input_folder}")
+    if method not in pdf_utils.PDF_METHODS:
+        raise ValueError(f"Unknown extraction method: {method}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(output_folder, MANIFEST_NAME)
+    completed = load_manifest(manifest_path)
+    
+    jobs = []
+    skipped = 0
+    for rel_path in find_files(input_folder, '.pdf'):
+        pdf_path = os.path.join(input_folder, rel_path)
+        output_path = os.path.join(output_folder, f"{os.path.splitext(rel_path)[0]}.{output_format}")
+        record = completed.get(rel_path)
+        if record and (record.get('method') != method
+                       or record.get('strip_running', False) != strip_running
+                       or record.get('format', 'txt') != output_format):
+            record = None  # Finished with other settings, so extract again
+        if is_completed(record, pdf_path, [output_path]):
+            skipped += 1
+            continue
+        record = {
+            'file': rel_path,
+            'output': os.path.relpath(output_path, output_folder),
+            'method': method,
+            'strip_running': strip_running,
+            'format': output_format
+        }
+        args = (pdf_path, output_path, method, tesseract_cmd, dpi, ocr_engine,
+                strip_running, output_format)
+        jobs.append((record, pdf_path, args))
+    
+    summary = {
+        'total': skipped + len(jobs), 'skipped': skipped, 'done': 0, 'failed': 0,
+        'ocr_pages': 0, 'ocr_cache_hits': 0, 'ocr_cache_hit_rate': 0.0
+    }
+    if not jobs:
+        return summary
+    
+    records = _run_jobs(_extract_pdf_job, jobs, manifest_path, workers, progress,
+                        initializer=_init_pdf_worker, initargs=(method, use_page_cache))
+    for record in records:
+        summary[record['status']] += 1
+        summary['ocr_pages'] += record.get('ocr_pages', 0)
+        summary['ocr_cache_hits'] += record.get('ocr_cache_hits', 0)
+    if summary['ocr_pages']:
+        summary['ocr_cache_hit_rate'] = summary['ocr_cache_hits'] / summary['ocr_pages']
+    return summary
+
+
+def batch_convert_epubs(input_folder, output_folder, formats=DEFAULT_EPUB_BATCH_FORMATS,
+                        workers=None, font_path='DejaVuSerif.ttf', manifest_path=None,
+                        progress=None, reader=epub_utils.DEFAULT_EPUB_READER,
+                        text_backend=epub_utils.DEFAULT_TEXT_BACKEND, use_chapter_cache=True):
+    """
+    Convert every EPUB below a folder to several formats, resuming earlier runs.
+    
+    Each EPUB is parsed once and written to every format, at the same
+    relative path in output_folder with the extension of each format. Books
+    are converted concurrently, one per worker process. Every finished or
+    failed book is appended to the JSONL manifest with its timing, so books
+    that have not changed since their outputs were written are skipped when
+    the batch is run again; failed books are retried. Chapter texts are
+    looked up in the shared per-chapter cache, so a revised edition of a
+    book only reparses the chapters that changed. A summary of the run,
+    with the timing or error of each converted book, is written to
+    epub_summary.json in output_folder.
+    
+    Args:
+        input_folder: Folder containing EPUB files (searched recursively)
+        output_folder: Folder for outputs
+        formats: Output formats, from EPUB_OUTPUT_EXTENSIONS
+        workers: Number of books converted concurrently (None uses all CPUs)
+        font_path: TrueType font for PDF output
+        manifest_path: Manifest location (default: output_folder/manifest.jsonl)
+        progress: Optional callable receiving each new manifest record
+        reader: One of epub_utils.EPUB_READERS
+        text_backend: One of epub_utils.TEXT_BACKENDS
+        use_chapter_cache: Reuse the text of chapters seen before
+    
+    Returns:
+        Dictionary with total, skipped, done and failed counts, the run's
+        elapsed seconds and the manifest records of the books converted
+    """
+    if not os.path.isdir(input_folder):
+        raise FileNotFoundError(f"Input folder not found: {input_folder}")
+    unknown = [name for name in formats if name not in EPUB_OUTPUT_EXTENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown EPUB output format: {unknown[0]}")
+    if not formats:
+        raise ValueError("No EPUB output format given")
+    if reader not in epub_utils.EPUB_READERS:
+        raise ValueError(f"Unknown EPUB reader: {reader}")
+    if text_backend not in epub_utils.TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend: {text_backend}")
+    
+    start = time.perf_counter()
+    formats = tuple(dict.fromkeys(formats))
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(output_folder, MANIFEST_NAME)
+    completed = load_manifest(manifest_path)
+    
+    jobs = []
+    skipped = 0
+    for rel_path in find_files(input_folder, '.epub'):
+        epub_path = os.path.join(input_folder, rel_path)
+        stem = os.path.splitext(rel_path)[0]
+        output_paths = {
+            name: os.path.join(output_folder, f"{stem}.{EPUB_OUTPUT_EXTENSIONS[name]}")
+            for name in formats
+        }
+        record = completed.get(rel_path)
+        if record and (not set(formats) <= set(record.get('formats', ()))
+                       or ('pdf' in formats and record.get('font') != font_path)):
+            record = None  # Finished without these formats or with another font
+        if is_completed(record, epub_path, output_paths.values()):
+            skipped += 1
+            continue
+        record = {
+            'file': rel_path,
+            'outputs': {
+                name: os.path.relpath(path, output_folder)
+                for name, path in output_paths.items()
+            },
+            'formats': list(formats),
+            'font': font_path
+        }
+        args = (epub_path, output_paths, font_path, reader, text_backend)
+        jobs.append((record, epub_path, args))
+    
+    summary = {
+        'total': skipped + len(jobs), 'skipped': skipped, 'done': 0, 'failed': 0,
+        'seconds': 0.0, 'books': []
+    }
+    if jobs:
+        summary['books'] = _run_jobs(_convert_epub_job, jobs, manifest_path, workers, progress,
+                                     initializer=_init_epub_worker, initargs=(use_chapter_cache,))
+        for record in summary['books']:
+            summary[record['status']] += 1
+    
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    summary_path = os.path.join(output_folder, EPUB_SUMMARY_NAME)
+    with open(f"{summary_path}.part", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(f"{summary_path}.part", summary_path)
+    return summary
@@ -0,0 +1,357 @@
+"""
+Cache Utilities Module
+Contains a content-addressed on-disk cache for extraction results.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import zlib
+
+# Default size cap for the on-disk cache (bytes of compressed entries)
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# Eviction removes least recently used entries until the cache is back down
+# to this fraction of its cap, so the directory is rescanned once per many
+# writes rather than on every write once the cache is full
+EVICT_LOW_WATER = 0.9
+
+# Block size used when hashing files from disk
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Per-page OCR results live in their own, smaller cache inside the cache
+# directory, so cover sheets and blank pages never push out whole documents
+PAGE_CACHE_SUBDIR = 'ocr-pages'
+DEFAULT_PAGE_CACHE_SIZE = 128 * 1024 * 1024
+
+# Per-chapter EPUB texts are cached the same way, so a revised edition of a
+# book reuses the text of every chapter that did not change
+CHAPTER_CACHE_SUBDIR = 'epub-chapters'
+DEFAULT_CHAPTER_CACHE_SIZE = 128 * 1024 * 1024
+
+
+def default_cache_dir():
+    """
+    Return the default cache directory.
+    
+    Uses the PYDOCFLOW_CACHE_DIR environment variable when set, otherwise
+    ~/.cache/pydocflow.
+    
+    Returns:
+        Cache directory path as string
+    """
+    return os.environ.get(
+        'PYDOCFLOW_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'pydocflow')
+    )
+
+
+def open_page_cache(cache_dir=None, max_bytes=DEFAULT_PAGE_CACHE_SIZE):
+    """
+    Open the per-page OCR result cache.
+    
+    Args:
+        cache_dir: Directory for page entries (default: ocr-pages inside
+            default_cache_dir())
+        max_bytes: Size cap for all compressed page entries together
+    
+    Returns:
+        ExtractionCache instance
+    """
+    return ExtractionCache(
+        cache_dir or os.path.join(default_cache_dir(), PAGE_CACHE_SUBDIR),
+        max_bytes
+    )
+
+
+def open_chapter_cache(cache_dir=None, max_bytes=DEFAULT_CHAPTER_CACHE_SIZE):
+    """
+    Open the per-chapter EPUB text cache.
+    
+    Args:
+        cache_dir: Directory for chapter entries (default: epub-chapters
+            inside default_cache_dir())
+        max_bytes: Size cap for all compressed chapter entries together
+    
+    Returns:
+        ExtractionCache instance
+    """
+    return ExtractionCache(
+        cache_dir or os.path.join(default_cache_dir(), CHAPTER_CACHE_SUBDIR),
+        max_bytes
+    )
+
+
+def hash_source(source):
+    """
+    Compute the SHA-256 hex digest of a document's contents.
+    
+    Args:
+        source: Path to a file, binary file object or bytes-like buffer
+    
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(block)
+    elif hasattr(source, 'read') and not isinstance(source, mmap.mmap):
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+        source.seek(0)
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache for extracted text.
+    
+    Entries are keyed by the SHA-256 of the input document plus the
+    extraction method and its parameters, stored zlib-compressed, and
+    evicted least-recently-used first down to EVICT_LOW_WATER of the size
+    cap once the cap is exceeded.
+    Hit and miss counters cover the lifetime of this object. The entry
+    count and total size are scanned from disk when the cache is opened
+    and then kept up to date by this object's writes, evictions and
+    clear(); refresh() rescans them to pick up other processes' changes.
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_SIZE):
+        """
+        Create or open a cache directory.
+        
+        Args:
+            cache_dir: Directory for cache entries (default: default_cache_dir())
+            max_bytes: Size cap for all compressed entries together
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = 0
+        self._count = 0
+        self.refresh()
+    
+    def make_key(self, source, method, **params):
+        """
+        Build a cache key for a document, method and extraction parameters.
+        
+        Args:
+            source: Path to a file, binary file object or bytes-like buffer
+            method: Extraction method name
+            **params: Parameters that affect the output (DPI, pages, versions)
+        
+        Returns:
+            Hex digest string
+        """
+        key_data = json.dumps(
+            {'content': hash_source(source), 'method': method, 'params': params},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+    
+    def _path(self, key):
+        """Return the entry path for a key, sharded by its first two characters."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.z")
+    
+    def _entries(self):
+        """Yield (path, size, last_used) for every entry in the cache."""
+        # Only the two-character shard directories hold entries; anything
+        # else (such as a nested page cache) belongs to someone else
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith('.z'):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Removed by a concurrent eviction
+                yield path, stat.st_size, stat.st_mtime
+    
+    def refresh(self):
+        """Rescan the cache directory for the current entry count and total size."""
+        entries = [size for _, size, _ in self._entries()]
+        self._count = len(entries)
+        self._size = sum(entries)
+    
+    def _store(self, temp_path, path, size):
+        """Move a finished temp file into place and account for the entry it adds or replaces."""
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = None
+        os.replace(temp_path, path)
+        if replaced is None:
+            self._count += 1
+            self._size += size
+        else:
+            self._size += size - replaced
+    
+    def get(self, key):
+        """
+        Look up a cached text.
+        
+        Args:
+            key: Key from make_key
+        
+        Returns:
+            Cached text as string, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+            os.utime(path)  # Mark as recently used
+        except (OSError, zlib.error, UnicodeDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+    
+    def put(self, key, text):
+        """
+        Store a text under a key, evicting old entries if over the size cap.
+        
+        Args:
+            key: Key from make_key
+            text: Text to store
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(text.encode('utf-8'))
+        
+        # Write to a temp file first so readers never see partial entries
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._store(temp_path, path, len(data))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        if self._size > self.max_bytes:
+            self._evict()
+    
+    def put_iter(self, key, chunks):
+        """
+        Store a text given in pieces, passing the pieces through.
+        
+        Each piece is compressed into the entry as it is consumed, so the
+        text is never joined in memory. The entry is stored only once all
+        pieces have been consumed; an abandoned iteration stores nothing.
+        
+        Args:
+            key: Key from make_key
+            chunks: Iterable of strings making up the text
+        
+        Yields:
+            Each string of chunks, in order
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressor = zlib.compressobj()
+        size = 0
+        
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    data = compressor.compress(chunk.encode('utf-8'))
+                    f.write(data)
+                    size += len(data)
+                    yield chunk
+                data = compressor.flush()
+                f.write(data)
+                size += len(data)
+            self._store(temp_path, path, size)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        if self._size > self.max_bytes:
+            self._evict()
+    
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached text for a key, computing and storing it on a miss.
+        
+        Args:
+            key: Key from make_key
+            compute: Callable returning the text when it is not cached
+        
+        Returns:
+            Text as string
+        """
+        text = self.get(key)
+        if text is None:
+            text = compute()
+            self.put(key, text)
+        return text
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache is below its low-water mark."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._count = len(entries)
+        self._size = sum(size for _, size, _ in entries)
+        if self._size <= self.max_bytes:
+            return  # Entries were already removed by another process
+        target = int(self.max_bytes * EVICT_LOW_WATER)
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass  # Already removed by another process
+            self._count -= 1
+            self._size -= size
+    
+    def clear(self):
+        """Remove all entries from the cache."""
+        for path, _, _ in list(self._entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Already removed by another process
+        self._count = 0
+        self._size = 0
+    
+    def stats(self, refresh=False):
+        """
+        Report cache usage without touching the disk.
+        
+        Args:
+            refresh: Rescan the cache directory first (see refresh())
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries,
+            size_bytes and max_bytes
+        """
+        if refresh:
+            self.refresh()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': self._count,
+            'size_bytes': self._size,
+            'max_bytes': self.max_bytes
+        }
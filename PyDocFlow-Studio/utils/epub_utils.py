@@ -3,138 +3,736 @@ EPUB Utilities Module
 Contains core functions for EPUB conversion to various formats.
 """
 import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from urllib.parse import unquote
+from xml.etree import ElementTree
 import ebooklib
 from ebooklib import epub
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
-from reportlab.lib.units import inch
+from lxml import etree, html as lxml_html
 from io import BytesIO
 from bs4 import BeautifulSoup
-import textwrap
 from docx import Document
 
+from utils import parallel_utils
+from utils import render_utils
 
-def epub_to_html(epub_file_path):
+
+# Output formats produced by convert_epub()
+EPUB_FORMATS = ('html', 'text', 'pdf', 'docx')
+
+# Ways of reading an EPUB. 'zip' reads the OPF manifest with zipfile and
+# decompresses only the XHTML documents, skipping images and fonts;
+# 'ebooklib' loads every item through epub.read_epub. Both return the same
+# documents in the same (manifest) order and the same body HTML.
+EPUB_READERS = ('zip', 'ebooklib')
+DEFAULT_EPUB_READER = 'zip'
+
+EPUB_CONTAINER_PATH = 'META-INF/container.xml'
+EPUB_PACKAGE_MEDIA_TYPE = 'application/oebps-package+xml'
+EPUB_DOCUMENT_MEDIA_TYPE = 'application/xhtml+xml'
+
+# Ways of turning chapter HTML into text, fastest first. Every backend gives
+# the same text as BeautifulSoup(html, 'html.parser').get_text() for the
+# body HTML the readers produce: strings inside script, style, template, rt
+# and rp are dropped, and whitespace-only runs outside pre and textarea
+# collapse to a single newline or space. 'strip' is a regex tokenizer,
+# 'lxml' walks an lxml tree and 'bs4' is the BeautifulSoup reference.
+TEXT_BACKENDS = ('strip', 'lxml', 'bs4')
+DEFAULT_TEXT_BACKEND = 'strip'
+
+# Word writers for text_to_word_doc(): 'stream' writes paragraphs straight
+# into the .docx package using python-docx's default template, while
+# 'python-docx' builds the whole document tree in memory first.
+DOCX_WRITERS = ('stream', 'python-docx')
+DEFAULT_DOCX_WRITER = 'stream'
+
+TEXT_HIDDEN_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+TEXT_PRESERVE_TAGS = frozenset(('pre', 'textarea'))
+TEXT_WHITESPACE = ' \t\n\r\f'
+
+# Markup token: comment, declaration or processing instruction, or a tag
+# (quoted attribute values may contain '>')
+TEXT_MARKUP = re.compile(
+    r'<(?:!--.*?-->|[!?][^>]*>|/?[a-zA-Z][^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>)', re.S
+)
+# Tags of hidden and whitespace-preserving elements, which split a chapter
+# into segments; group 3 is the slash of a self-closing tag
+TEXT_SPECIAL_TAG = re.compile(
+    r'<(/?)(' + '|'.join(sorted(TEXT_HIDDEN_TAGS | TEXT_PRESERVE_TAGS)) + r')\b[^>]*?(/?)>', re.I
+)
+TEXT_SPECIAL_MARKERS = tuple('<' + name for name in TEXT_HIDDEN_TAGS | TEXT_PRESERVE_TAGS)
+# Comments and declarations, emptied before looking for special tags
+TEXT_COMMENT = re.compile(r'<!--.*?-->|<[!?][^>]*>', re.S)
+
+# Books with less chapter XHTML than this are always parsed serially, since
+# starting a process pool costs more than it saves on small books.
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+_TEXT_XML_PARSER = etree.XMLParser(recover=True, resolve_entities=False, huge_tree=True)
+
+
+def _body_content(content):
+    """
+    Return the inner HTML of a document's body as UTF-8 bytes.
+    
+    Same result as ebooklib's EpubHtml.get_body_content(), so both readers
+    produce identical HTML and text.
+    """
+    try:
+        html_tree = lxml_html.document_fromstring(
+            content, parser=lxml_html.HTMLParser(encoding='utf-8')
+        )
+    except Exception:  # ebooklib treats any parse failure as an empty body
+        return b''
+    
+    body = html_tree.find('body')
+    if body is None or len(body) == 0:
+        return b''
+    tree_str = etree.tostring(body, pretty_print=True, encoding='utf-8', xml_declaration=False)
+    if tree_str.startswith(b'<body>'):
+        return tree_str[6:tree_str.rindex(b'</body>')]
+    return tree_str
+
+
+def _document_members(archive):
+    """
+    List the archive member names of an EPUB's XHTML documents.
+    
+    Only the container and package documents are read. Members are listed
+    in manifest order, the order epub.read_epub returns them in.
+    
+    Args:
+        archive: Open zipfile.ZipFile of the EPUB
+    
+    Returns:
+        List of member names
+    """
+    container = ElementTree.fromstring(archive.read(EPUB_CONTAINER_PATH))
+    opf_path = None
+    for rootfile in container.iterfind('.//{*}rootfile'):
+        if rootfile.get('media-type') == EPUB_PACKAGE_MEDIA_TYPE:
+            opf_path = rootfile.get('full-path')
+    if opf_path is None:
+        raise ValueError("EPUB container lists no package document")
+    
+    package = ElementTree.fromstring(archive.read(opf_path))
+    opf_dir = posixpath.dirname(opf_path)
+    manifest = package.find('{*}manifest')
+    
+    documents = []
+    for item in (manifest if manifest is not None else []):
+        if item.tag.rpartition('}')[2] != 'item' or item.get('media-type') != EPUB_DOCUMENT_MEDIA_TYPE:
+            continue
+        href = item.get('href')
+        # Like ebooklib, navigation documents are looked up without unquoting
+        if 'nav' not in item.get('properties', '').split(' '):
+            href = unquote(href)
+        documents.append(posixpath.normpath(posixpath.join(opf_dir, href)))
+    return documents
+
+
+def _collapse_run(run, collapse):
+    """Collapse one run of decoded text to a newline or space if it is whitespace-only."""
+    if collapse and not run.strip(TEXT_WHITESPACE):
+        return '\n' if '\n' in run else ' '
+    return run
+
+
+def _text_run(run, collapse):
+    """Unescape one run of raw markup text between tags, collapsing it if whitespace-only."""
+    if '&' in run:
+        run = unescape(run)
+    return _collapse_run(run, collapse)
+
+
+def _text_runs(segment, collapse):
+    """Return the unescaped text runs of a segment without hidden elements."""
+    return [_text_run(run, collapse) for run in TEXT_MARKUP.split(segment) if run]
+
+
+def _strip_text(content):
+    """'strip' backend: tokenize the markup with regular expressions."""
+    lowered = content.lower()
+    if not any(marker in lowered for marker in TEXT_SPECIAL_MARKERS):
+        return ''.join(_text_runs(content, True))
+    
+    # Comments still split runs, but must not hide or fake special tags
+    if '<!' in content or '<?' in content:
+        content = TEXT_COMMENT.sub('<!---->', content)
+    
+    # Only text outside hidden elements counts; only text outside
+    # whitespace-preserving elements is collapsed
+    pieces = []
+    hidden = preserve = 0
+    position = 0
+    for match in TEXT_SPECIAL_TAG.finditer(content):
+        if position < match.start() and not hidden:
+            pieces.extend(_text_runs(content[position:match.start()], not preserve))
+        position = match.end()
+        if match.group(3):
+            continue
+        closing = bool(match.group(1))
+        if match.group(2).lower() in TEXT_HIDDEN_TAGS:
+            hidden = max(hidden - 1, 0) if closing else hidden + 1
+        else:
+            preserve = max(preserve - 1, 0) if closing else preserve + 1
+    if position < len(content) and not hidden:
+        pieces.extend(_text_runs(content[position:], not preserve))
+    return ''.join(pieces)
+
+
+def _lxml_text(content):
+    """'lxml' backend: parse the markup as an XML fragment and walk the tree; lxml decodes entities once."""
+    root = etree.fromstring(f'<root>{content}</root>'.encode('utf-8'), _TEXT_XML_PARSER)
+    if root is None:
+        raise ValueError("Unparseable chapter HTML")
+    
+    pieces = []
+    
+    def walk(element, preserve):
+        if element.text:
+            pieces.append(_collapse_run(element.text, not preserve))
+        for child in element:
+            if isinstance(child.tag, str):
+                name = child.tag.rpartition('}')[2].lower()
+                if name not in TEXT_HIDDEN_TAGS:
+                    walk(child, preserve or name in TEXT_PRESERVE_TAGS)
+            if child.tail:
+                pieces.append(_collapse_run(child.tail, not preserve))
+    
+    walk(root, False)
+    return ''.join(pieces)
+
+
+def html_to_text(content, backend=DEFAULT_TEXT_BACKEND):
+    """
+    Convert chapter HTML to plain text.
+    
+    Args:
+        content: HTML string
+        backend: One of TEXT_BACKENDS
+    
+    Returns:
+        Text content as string
+    """
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend: {backend}")
+    if backend == 'strip':
+        return _strip_text(content)
+    if backend == 'lxml':
+        try:
+            return _lxml_text(content)
+        except (ValueError, etree.LxmlError):
+            pass  # Fall back to BeautifulSoup
+    return BeautifulSoup(content, 'html.parser').get_text()
+
+
+def _parse_chapters(epub_file_path, chapters, text_backend, with_text):
+    """
+    Worker: compute the body HTML, and optionally the text, of some chapters.
+    
+    Args:
+        epub_file_path: EPUB path to read the chapters from, or None when
+            chapters holds the document bytes themselves
+        chapters: Archive member names, or document bytes
+        text_backend: One of TEXT_BACKENDS
+        with_text: Also convert each chapter to text
+    
+    Returns:
+        List of (html, text) tuples, text being None unless with_text
+    """
+    archive = zipfile.ZipFile(epub_file_path) if epub_file_path else None
+    try:
+        results = []
+        for chapter in chapters:
+            content = archive.read(chapter) if archive else chapter
+            html = _body_content(content).decode('utf-8')
+            results.append((html, html_to_text(html, text_backend) if with_text else None))
+        return results
+    finally:
+        if archive:
+            archive.close()
+
+
+class EpubDocument:
+    """
+    An EPUB parsed once and shared by every converter.
+    
+    The book is read on first use. Each chapter's HTML and text are
+    computed when first requested and kept, so producing several output
+    formats from one document parses the EPUB and each chapter only once.
+    With several workers, html() and text() parse the chapters of large
+    books in a process pool. With a chapter cache, chapter texts are looked
+    up by the hash of each chapter's document before it is parsed.
+    """
+    
+    def __init__(self, epub_file_path, reader=DEFAULT_EPUB_READER, text_backend=DEFAULT_TEXT_BACKEND,
+                 workers=1, chapter_cache=None):
+        """
+        Open an EPUB file.
+        
+        Args:
+            epub_file_path: Path to EPUB file
+            reader: One of EPUB_READERS
+            text_backend: One of TEXT_BACKENDS, used by chapter_text()
+            workers: Number of worker processes (1 runs serially, None uses all CPUs)
+            chapter_cache: Optional ExtractionCache for chapter texts, see
+                cache_utils.open_chapter_cache
+        """
+        if not epub_file_path or not os.path.exists(epub_file_path):
+            raise FileNotFoundError(f"EPUB file not found: {epub_file_path}")
+        if reader not in EPUB_READERS:
+            raise ValueError(f"Unknown EPUB reader: {reader}")
+        if text_backend not in TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend: {text_backend}")
+        
+        self.path = epub_file_path
+        self.reader = reader
+        self.text_backend = text_backend
+        self.workers = parallel_utils.resolve_workers(workers)
+        self.chapter_cache = chapter_cache
+        self._items = None
+        self._sizes = []
+        self._html = []
+        self._text = []
+    
+    @property
+    def items(self):
+        """Document items in manifest order (ebooklib items or member names), read on first use."""
+        if self._items is None:
+            if self.reader == 'zip':
+                try:
+                    with zipfile.ZipFile(self.path) as archive:
+                        self._items = _document_members(archive)
+                        self._sizes = [
+                            info.file_size if info else 0
+                            for info in map(archive.NameToInfo.get, self._items)
+                        ]
+                except (KeyError, ValueError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+                    raise IOError(f"EPUB read error: {str(e)}") from e
+            else:
+                try:
+                    book = epub.read_epub(self.path)
+                except (IOError, OSError) as e:
+                    raise IOError(f"EPUB read error: {str(e)}") from e
+                self._items = list(book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
+                self._sizes = [len(item.content or b'') for item in self._items]
+            self._html = [None] * len(self._items)
+            self._text = [None] * len(self._items)
+        return self._items
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def _load_html(self, indices):
+        """Compute and keep the body HTML of the given chapters."""
+        items = self.items
+        if self.reader == 'ebooklib':
+            for index in indices:
+                self._html[index] = items[index].get_body_content().decode('utf-8')
+            return
+        try:
+            with zipfile.ZipFile(self.path) as archive:
+                for index in indices:
+                    self._html[index] = _body_content(archive.read(items[index])).decode('utf-8')
+        except (KeyError, zipfile.BadZipFile) as e:
+            raise IOError(f"EPUB read error: {str(e)}") from e
+    
+    def chapter_html(self, index):
+        """
+        Return the body HTML of one chapter.
+        
+        Args:
+            index: 0-based chapter index
+        
+        Returns:
+            HTML content as string
+        """
+        if self._items is None or self._html[index] is None:
+            self._load_html([index])
+        return self._html[index]
+    
+    def chapter_text(self, index):
+        """
+        Return the plain text of one chapter.
+        
+        Args:
+            index: 0-based chapter index
+        
+        Returns:
+            Text content as string
+        """
+        if self._items is None or self._text[index] is None:
+            keys = {index: None}
+            if self.chapter_cache is not None:
+                keys = self._lookup_texts([index])
+            self._compute_texts(keys)
+        return self._text[index]
+    
+    def _iter_contents(self, indices):
+        """Yield (index, document bytes) for the given chapters."""
+        items = self.items
+        if self.reader == 'ebooklib':
+            for index in indices:
+                yield index, items[index].content
+            return
+        try:
+            with zipfile.ZipFile(self.path) as archive:
+                for index in indices:
+                    yield index, archive.read(items[index])
+        except (KeyError, zipfile.BadZipFile) as e:
+            raise IOError(f"EPUB read error: {str(e)}") from e
+    
+    def _lookup_texts(self, indices):
+        """
+        Fill chapter texts from the chapter cache.
+        
+        Args:
+            indices: Chapters without text
+        
+        Returns:
+            Dictionary mapping each chapter not in the cache to its cache key
+        """
+        misses = {}
+        for index, content in self._iter_contents(indices):
+            key = self.chapter_cache.make_key(content, 'epub-chapter-text', text_backend=self.text_backend)
+            text = self.chapter_cache.get(key)
+            if text is None:
+                misses[index] = key
+            else:
+                self._text[index] = text
+        return misses
+    
+    def _compute_texts(self, keys):
+        """Compute the missing texts of chapters and store those with a cache key."""
+        for index, key in keys.items():
+            html = self.chapter_html(index)
+            if self._text[index] is None:
+                self._text[index] = html_to_text(html, self.text_backend)
+            if key is not None:
+                self.chapter_cache.put(key, self._text[index])
+    
+    def _load_parallel(self, indices, with_text):
+        """Parse the given chapters in a process pool and keep the results in order."""
+        items = self.items
+        if self.reader == 'zip':
+            epub_file_path = self.path
+            chapters = [items[index] for index in indices]
+        else:
+            epub_file_path = None
+            chapters = [items[index].content for index in indices]
+        
+        index_slices = parallel_utils.page_slices(indices, self.workers)
+        chapter_slices = parallel_utils.page_slices(chapters, self.workers)
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(index_slices)))
+        try:
+            futures = [
+                executor.submit(_parse_chapters, epub_file_path, chapter_slice,
+                                self.text_backend, with_text)
+                for chapter_slice in chapter_slices
+            ]
+            for index_slice, future in zip(index_slices, futures):
+                for index, (html, text) in zip(index_slice, future.result()):
+                    self._html[index] = html
+                    if text is not None:
+                        self._text[index] = text
+        except (KeyError, zipfile.BadZipFile) as e:
+            raise IOError(f"EPUB read error: {str(e)}") from e
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _load_all(self, with_text=False):
+        """Load every missing chapter, in a process pool when the book is large enough."""
+        missing = [
+            index for index in range(len(self))
+            if (self._text[index] if with_text else self._html[index]) is None
+        ]
+        keys = {}
+        if with_text and self.chapter_cache is not None and missing:
+            # Only chapters whose documents changed are parsed
+            keys = self._lookup_texts(missing)
+            missing = list(keys)
+        
+        if (self.workers > 1 and len(missing) > 1
+                and sum(self._sizes[index] for index in missing) >= PARALLEL_MIN_BYTES):
+            self._load_parallel(missing, with_text)
+        else:
+            self._load_html([index for index in missing if self._html[index] is None])
+        self._compute_texts(keys)
+    
+    def iter_chapter_texts(self):
+        """Yield the text of each chapter in order."""
+        if self.workers > 1:
+            self._load_all(with_text=True)
+        for index in range(len(self)):
+            yield self.chapter_text(index)
+    
+    def html(self):
+        """Return the HTML of all chapters joined by newlines."""
+        self._load_all()
+        return "\n".join(self._html)
+    
+    def text(self):
+        """Return the text of all chapters joined by newlines."""
+        self._load_all(with_text=True)
+        return "\n".join(self.chapter_text(index) for index in range(len(self)))
+
+
+def open_epub(epub_source, reader=DEFAULT_EPUB_READER, text_backend=DEFAULT_TEXT_BACKEND, workers=1,
+              chapter_cache=None):
+    """
+    Return an EpubDocument for a path, or the document itself.
+    
+    Args:
+        epub_source: Path to EPUB file or EpubDocument
+        reader: One of EPUB_READERS, used when opening a path
+        text_backend: One of TEXT_BACKENDS, used when opening a path
+        workers: Number of worker processes, used when opening a path
+        chapter_cache: Optional per-chapter text cache, used when opening a path
+    
+    Returns:
+        EpubDocument
+    """
+    if isinstance(epub_source, EpubDocument):
+        return epub_source
+    return EpubDocument(epub_source, reader, text_backend, workers, chapter_cache)
+
+
+def _as_text(source):
+    """Return the text of an EpubDocument, or a text string unchanged."""
+    if isinstance(source, EpubDocument):
+        try:
+            return source.text()
+        except UnicodeDecodeError as e:
+            raise IOError(f"EPUB to text conversion error: {str(e)}") from e
+    return source
+
+
+def epub_to_html(epub_source, reader=DEFAULT_EPUB_READER, workers=1):
     """
     Convert EPUB to HTML content.
     
     Args:
-        epub_file_path: Path to EPUB file
+        epub_source: Path to EPUB file or EpubDocument
+        reader: One of EPUB_READERS, used when opening a path
+        workers: Number of worker processes (1 runs serially, None uses all CPUs),
+            used when opening a path
         
     Returns:
         HTML content as string
     """
-    if not epub_file_path or not os.path.exists(epub_file_path):
-        raise FileNotFoundError(f"EPUB file not found: {epub_file_path}")
+    document = open_epub(epub_source, reader, workers=workers)
     
     try:
-        book = epub.read_epub(epub_file_path)
-        html_content = []
-        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-            content = item.get_body_content().decode('utf-8')
-            html_content.append(content)
-        return "\n".join(html_content)
+        return document.html()
     except (IOError, OSError, UnicodeDecodeError) as e:
         raise IOError(f"EPUB to HTML conversion error: {str(e)}") from e
 
 
-def epub_to_clean_text(epub_file_path):
+def _text_cache_key(cache, document):
+    """Return the extraction cache key for the text of an EpubDocument."""
+    return cache.make_key(document.path, 'epub-text', reader=document.reader,
+                          text_backend=document.text_backend)
+
+
+def _iter_paragraphs_cached(document, cache, key):
+    """Yield the paragraphs of an EpubDocument while storing its text in the cache."""
+    def chunks():
+        for index, chapter in enumerate(document.iter_chapter_texts()):
+            yield "\n" + chapter if index else chapter
+    
+    try:
+        for index, chunk in enumerate(cache.put_iter(key, chunks())):
+            yield from (chunk[1:] if index else chunk).split("\n")
+    except UnicodeDecodeError as e:
+        raise IOError(f"EPUB to text conversion error: {str(e)}") from e
+
+
+def epub_to_clean_text(epub_source, cache=None, reader=DEFAULT_EPUB_READER,
+                       text_backend=DEFAULT_TEXT_BACKEND, workers=1, chapter_cache=None):
     """
     Extract and clean text from EPUB file.
     
+    With a chapter cache, only chapters whose documents are not cached yet
+    are parsed; the text is the same as a full conversion.
+    
     Args:
-        epub_file_path: Path to EPUB file
+        epub_source: Path to EPUB file or EpubDocument
+        cache: Optional ExtractionCache consulted before converting
+        reader: One of EPUB_READERS, used when opening a path
+        text_backend: One of TEXT_BACKENDS, used when opening a path
+        workers: Number of worker processes (1 runs serially, None uses all CPUs),
+            used when opening a path
+        chapter_cache: Optional per-chapter text cache (see
+            cache_utils.open_chapter_cache), used when opening a path
         
     Returns:
         Clean text content as string
     """
-    if not epub_file_path or not os.path.exists(epub_file_path):
-        raise FileNotFoundError(f"EPUB file not found: {epub_file_path}")
+    document = open_epub(epub_source, reader, text_backend, workers, chapter_cache)
+    
+    if cache is not None:
+        return cache.get_or_compute(
+            _text_cache_key(cache, document),
+            lambda: epub_to_clean_text(document)
+        )
     
     try:
-        book = epub.read_epub(epub_file_path)
-        text = []
-        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-            content = item.get_body_content().decode('utf-8')
-            soup = BeautifulSoup(content, 'html.parser')
-            text.append(soup.get_text())
-        return "\n".join(text)
+        return document.text()
     except (IOError, OSError, UnicodeDecodeError) as e:
         raise IOError(f"EPUB to text conversion error: {str(e)}") from e
 
 
-def text_to_styled_pdf(text, font_path='DejaVuSerif.ttf'):
+def _iter_paragraphs(source):
+    """Yield the paragraphs (lines) of a text string, EpubDocument or iterable of paragraphs."""
+    if isinstance(source, str):
+        yield from source.split("\n")
+    elif isinstance(source, EpubDocument):
+        try:
+            for chapter in source.iter_chapter_texts():
+                yield from chapter.split("\n")
+        except UnicodeDecodeError as e:
+            raise IOError(f"EPUB to text conversion error: {str(e)}") from e
+    else:
+        yield from source
+
+
+def text_to_styled_pdf(text, font_path='DejaVuSerif.ttf', output=None):
     """
     Convert text to styled PDF with text wrapping and Unicode support.
     
+    Pages are written as they are laid out; pass an output path or file to
+    keep the PDF out of memory.
+    
     Args:
-        text: Text content to convert
-        font_path: Path to Unicode font file
+        text: Text content, EpubDocument or iterable of paragraphs to convert
+        font_path: Path to Unicode font file (Helvetica if unavailable)
+        output: Optional output path or writable binary file object
         
     Returns:
-        BytesIO buffer containing PDF
+        BytesIO buffer containing PDF, or output when given
     """
+    buffer = BytesIO() if output is None else output
     try:
-        buffer = BytesIO()
-        
-        # Try to register font, use Helvetica as fallback
-        try:
-            pdfmetrics.registerFont(TTFont('DejaVu', font_path))
-            font_name = 'DejaVu'
-        except (OSError, IOError, RuntimeError):
-            font_name = 'Helvetica'
-        
-        p = canvas.Canvas(buffer, pagesize=letter)
-        _, height = letter
-        margin = inch
-        y = height - margin
-
-        p.setFont(font_name, 12)
-
-        # Split text into paragraphs
-        paragraphs = text.split("\n")
-
-        for paragraph in paragraphs:
-            lines = textwrap.wrap(paragraph, width=85)
-            for line in lines:
-                if y < margin + 20:
-                    p.showPage()
-                    p.setFont(font_name, 12)
-                    y = height - margin
-                p.drawString(margin, y, line)
-                y -= 15
-            y -= 15
-
-        p.save()
-        buffer.seek(0)
-        return buffer
+        render_utils.write_styled_pdf(_iter_paragraphs(text), buffer, font_path)
     except (IOError, OSError, RuntimeError) as e:
         raise RuntimeError(f"Text to PDF conversion error: {str(e)}") from e
+    if output is None:
+        buffer.seek(0)
+    return buffer
 
 
-def text_to_word_doc(text):
+def text_to_word_doc(text, output=None, writer=DEFAULT_DOCX_WRITER):
     """
     Convert text to Word document (.docx).
     
+    The 'stream' writer writes paragraphs straight into the package; the
+    'python-docx' writer builds the document in memory and is also used
+    when the streaming template cannot be read. Both drop characters that
+    XML cannot hold (render_utils.DOCX_INVALID_CHARS), such as control
+    characters left in extracted text.
+    
     Args:
-        text: Text content to convert
+        text: Text content, EpubDocument or iterable of paragraphs to convert
+        output: Optional output path or writable binary file object
+        writer: One of DOCX_WRITERS
         
     Returns:
-        BytesIO buffer containing Word document
+        BytesIO buffer containing Word document, or output when given
     """
+    if writer not in DOCX_WRITERS:
+        raise ValueError(f"Unknown Word writer: {writer}")
+    if writer == 'stream':
+        try:
+            render_utils.load_docx_template()
+        except IOError:
+            writer = 'python-docx'
+    
+    buffer = BytesIO() if output is None else output
+    paragraphs = (paragraph.strip() for paragraph in _iter_paragraphs(text) if paragraph.strip())
     try:
-        doc = Document()
-        paragraphs = text.split("\n")
-
-        for paragraph in paragraphs:
-            if paragraph.strip():
-                doc.add_paragraph(paragraph.strip())
-        
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+        if writer == 'stream':
+            render_utils.write_docx(paragraphs, buffer)
+        else:
+            doc = Document()
+            for paragraph in paragraphs:
+                doc.add_paragraph(render_utils.DOCX_INVALID_CHARS.sub('', paragraph))
+            doc.save(buffer)
     except (IOError, OSError) as e:
         raise IOError(f"Text to Word conversion error: {str(e)}") from e
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+def convert_epub(epub_source, formats=EPUB_FORMATS, font_path='DejaVuSerif.ttf', cache=None,
+                 reader=DEFAULT_EPUB_READER, text_backend=DEFAULT_TEXT_BACKEND, workers=1,
+                 output_paths=None, chapter_cache=None):
+    """
+    Convert one EPUB to several output formats from a single parse.
+    
+    Formats listed in output_paths are written straight to those files; a
+    PDF is then streamed page by page instead of being built in memory.
+    
+    Args:
+        epub_source: Path to EPUB file or EpubDocument
+        formats: Output formats, from EPUB_FORMATS
+        font_path: Path to Unicode font file, for PDF output
+        cache: Optional ExtractionCache consulted for the text
+        reader: One of EPUB_READERS, used when opening a path
+        text_backend: One of TEXT_BACKENDS, used when opening a path
+        workers: Number of worker processes (1 runs serially, None uses all CPUs),
+            used when opening a path
+        output_paths: Optional dictionary mapping formats to output file paths
+        chapter_cache: Optional per-chapter text cache, used when opening a path
+        
+    Returns:
+        Dictionary mapping each format to its output: the file path for
+        formats in output_paths, otherwise a string for 'html' and 'text'
+        and a BytesIO buffer for 'pdf' and 'docx'
+    """
+    unknown = [name for name in formats if name not in EPUB_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown EPUB output format: {unknown[0]}")
+    
+    output_paths = output_paths or {}
+    document = open_epub(epub_source, reader, text_backend, workers, chapter_cache)
+    outputs = {}
+    
+    def keep(name, content):
+        """Store a string output, writing it to its file if one was given."""
+        if name in output_paths:
+            with open(output_paths[name], 'w', encoding='utf-8') as f:
+                f.write(content)
+            content = output_paths[name]
+        outputs[name] = content
+    
+    if 'html' in formats:
+        keep('html', epub_to_html(document))
+    
+    text_formats = [name for name in formats if name != 'html']
+    if text_formats:
+        # PDF and Word output alone are streamed chapter by chapter without
+        # joining the text; on a cache miss the first of them also streams
+        # the text into the cache entry
+        text = document
+        stream = None
+        if 'text' in formats:
+            text = epub_to_clean_text(document, cache=cache)
+            keep('text', text)
+        elif cache is not None:
+            key = _text_cache_key(cache, document)
+            text = cache.get(key)
+            if text is None:
+                text = document
+                stream = _iter_paragraphs_cached(document, cache, key)
+        if 'pdf' in formats:
+            outputs['pdf'] = text_to_styled_pdf(stream or text, font_path, output_paths.get('pdf'))
+            stream = None
+        if 'docx' in formats:
+            outputs['docx'] = text_to_word_doc(stream or text, output_paths.get('docx'))
+    return outputs
@@ -0,0 +1,268 @@
+"""
+Layout Utilities Module
+Contains compact storage for positioned text spans and reading-order rendering.
+"""
+from array import array
+from io import StringIO
+
+# Blocks within this fraction of the page width of the centre line still
+# count as belonging to one column rather than spanning both
+COLUMN_TOLERANCE = 0.05
+
+
+class SpanTable:
+    """
+    Column store of positioned text spans for a whole document.
+    
+    Each span is one row across typed arrays (x0, y0, x1, y1, font id,
+    size, text offset, block and line number) instead of a nested dict, so
+    a span costs about 30 bytes plus its characters. Span texts live in one
+    shared string and font names are stored once. Spans are kept grouped by
+    page in document order.
+    """
+    
+    def __init__(self):
+        """Create an empty table."""
+        self.x0 = array('f')
+        self.y0 = array('f')
+        self.x1 = array('f')
+        self.y1 = array('f')
+        self.font = array('H')
+        self.size = array('f')
+        self.text_start = array('I')
+        self.block = array('H')
+        self.line = array('H')
+        
+        self.page_numbers = array('I')
+        self.page_width = array('f')
+        self.page_height = array('f')
+        self.page_start = array('I')
+        
+        self.fonts = []
+        self._font_ids = {}
+        self._text_buffer = StringIO()
+        self._text_length = 0
+        self._text = None
+    
+    def __len__(self):
+        return len(self.x0)
+    
+    def _font_id(self, font_name):
+        """Return the id of a font name, registering it on first use."""
+        font_id = self._font_ids.get(font_name)
+        if font_id is None:
+            font_id = self._font_ids[font_name] = len(self.fonts)
+            self.fonts.append(font_name)
+        return font_id
+    
+    def add_page(self, page_number, page_dict):
+        """
+        Append the text spans of one page.
+        
+        Args:
+            page_number: 1-based page number
+            page_dict: Output of PyMuPDF page.get_text("dict")
+        """
+        self.page_numbers.append(page_number)
+        self.page_width.append(page_dict['width'])
+        self.page_height.append(page_dict['height'])
+        self.page_start.append(len(self))
+        self._text = None
+        
+        for block_number, block in enumerate(page_dict['blocks']):
+            if block.get('type', 0) != 0:
+                continue  # Image block
+            for line_number, line in enumerate(block['lines']):
+                for span in line['spans']:
+                    x0, y0, x1, y1 = span['bbox']
+                    self.x0.append(x0)
+                    self.y0.append(y0)
+                    self.x1.append(x1)
+                    self.y1.append(y1)
+                    self.font.append(self._font_id(span['font']))
+                    self.size.append(span['size'])
+                    self.text_start.append(self._text_length)
+                    self.block.append(block_number)
+                    self.line.append(line_number)
+                    self._text_length += self._text_buffer.write(span['text'])
+    
+    @property
+    def text(self):
+        """All span texts concatenated; slice with text_start offsets."""
+        if self._text is None:
+            self._text = self._text_buffer.getvalue()
+        return self._text
+    
+    def span_text(self, index):
+        """
+        Return the text of one span.
+        
+        Args:
+            index: Span row number
+        
+        Returns:
+            Span text as string
+        """
+        end = self.text_start[index + 1] if index + 1 < len(self) else self._text_length
+        return self.text[self.text_start[index]:end]
+    
+    def page_range(self, page_index):
+        """
+        Return the span rows of one page.
+        
+        Args:
+            page_index: 0-based position of the page in this table
+        
+        Returns:
+            range of span row numbers
+        """
+        stop = (self.page_start[page_index + 1] if page_index + 1 < len(self.page_start)
+                else len(self))
+        return range(self.page_start[page_index], stop)
+    
+    def nbytes(self):
+        """
+        Estimate the memory held by the table.
+        
+        Returns:
+            Size in bytes of all columns and span text
+        """
+        columns = (
+            self.x0, self.y0, self.x1, self.y1, self.font, self.size,
+            self.text_start, self.block, self.line, self.page_numbers,
+            self.page_width, self.page_height, self.page_start
+        )
+        return sum(column.itemsize * len(column) for column in columns) + self._text_length
+
+
+def page_blocks(table, page_index):
+    """
+    Assemble the text blocks of one page from its spans.
+    
+    Args:
+        table: SpanTable
+        page_index: 0-based position of the page in the table
+    
+    Returns:
+        List of (x0, y0, x1, y1, lines) in stored order, where lines is a
+        list of line texts
+    """
+    text = table.text
+    text_start = table.text_start
+    rows = table.page_range(page_index)
+    
+    blocks = []
+    current_block = current_line = None
+    for index in rows:
+        end = text_start[index + 1] if index + 1 < len(table) else len(text)
+        span_text = text[text_start[index]:end]
+        block_number = table.block[index]
+        line_number = table.line[index]
+        
+        if block_number != current_block:
+            current_block, current_line = block_number, line_number
+            blocks.append([table.x0[index], table.y0[index], table.x1[index],
+                           table.y1[index], [span_text]])
+            continue
+        
+        block = blocks[-1]
+        block[0] = min(block[0], table.x0[index])
+        block[1] = min(block[1], table.y0[index])
+        block[2] = max(block[2], table.x1[index])
+        block[3] = max(block[3], table.y1[index])
+        if line_number != current_line:
+            current_line = line_number
+            block[4].append(span_text)
+        else:
+            block[4][-1] += span_text
+    return [tuple(block) for block in blocks]
+
+
+def _overlaps_vertically(block, others):
+    """Return True if any of the other blocks shares a horizontal strip with block."""
+    return any(other[1] < block[3] and block[1] < other[3] for other in others)
+
+
+def reading_order(blocks, page_width, tolerance=COLUMN_TOLERANCE):
+    """
+    Sort the blocks of a page into reading order, handling two columns.
+    
+    Blocks are taken top to bottom. Runs of blocks that sit entirely in the
+    left or right half form a band that is read left column first, then
+    right column. A band ends at a block spanning both halves (a title, a
+    full-width caption) or at a one-sided block with nothing beside it
+    once both columns have started (a footnote under both columns).
+    
+    Args:
+        blocks: List of (x0, y0, x1, y1, lines) tuples
+        page_width: Page width in points
+        tolerance: Fraction of page width a column block may cross the centre
+    
+    Returns:
+        List of blocks in reading order
+    """
+    middle = page_width / 2
+    margin = page_width * tolerance
+    
+    def side(block):
+        if block[2] <= middle + margin:
+            return 0
+        if block[0] >= middle - margin:
+            return 1
+        return None
+    
+    halves = ([], [])
+    for block in blocks:
+        if side(block) is not None:
+            halves[side(block)].append(block)
+    
+    ordered = []
+    band = ([], [])
+    for block in sorted(blocks, key=lambda block: (block[1], block[0])):
+        block_side = side(block)
+        if block_side is not None and not (
+                band[1 - block_side] and not _overlaps_vertically(block, halves[1 - block_side])):
+            band[block_side].append(block)
+            continue
+        ordered.extend(band[0] + band[1])
+        band = ([], [])
+        ordered.append(block)
+    ordered.extend(band[0] + band[1])
+    return ordered
+
+
+def iter_page_texts(table, sort=True):
+    """
+    Render each page of a SpanTable as plain text.
+    
+    Lines end with a newline, as in PyMuPDF's get_text("text"); with
+    sort=False blocks keep their stored order and the output matches it.
+    
+    Args:
+        table: SpanTable
+        sort: Reorder blocks into reading order (see reading_order)
+    
+    Yields:
+        Tuples of (page_number, text)
+    """
+    for page_index, page_number in enumerate(table.page_numbers):
+        blocks = page_blocks(table, page_index)
+        if sort:
+            blocks = reading_order(blocks, table.page_width[page_index])
+        yield page_number, "".join(
+            f"{line}\n" for block in blocks for line in block[4]
+        )
+
+
+def render_text(table, sort=True):
+    """
+    Render a SpanTable as plain text in reading order.
+    
+    Args:
+        table: SpanTable
+        sort: Reorder blocks into reading order (see reading_order)
+    
+    Returns:
+        Text of all pages as string
+    """
+    return "".join(text for _, text in iter_page_texts(table, sort))
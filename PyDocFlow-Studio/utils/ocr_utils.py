@@ -0,0 +1,246 @@
+"""
+OCR Utilities Module
+Contains OCR engines that turn page image files into text with Tesseract.
+"""
+import abc
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr  # Optional in-process bindings to the Tesseract library
+except ImportError:
+    tesserocr = None
+
+# Engine names accepted by create_engine(), fastest first
+OCR_ENGINES = ('tesserocr', 'tesseract-batch', 'tesseract')
+
+# 'auto' picks the fastest engine that is installed
+DEFAULT_OCR_ENGINE = 'auto'
+
+# Engine owned by an OCR worker process, created once by init_worker()
+_worker_engine = None
+
+
+class OcrEngine(abc.ABC):
+    """
+    Base class for OCR engines.
+    
+    Engines are created once and reused for many pages, so expensive setup
+    such as loading language data is paid once per engine, not per page.
+    """
+    name = None
+    
+    @abc.abstractmethod
+    def ocr_files(self, image_paths):
+        """
+        OCR page image files.
+        
+        Args:
+            image_paths: List of image file paths
+        
+        Returns:
+            List of texts in the same order
+        """
+    
+    def close(self):
+        """Release resources held by the engine."""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TesseractEngine(OcrEngine):
+    """
+    Runs one tesseract process per page image through pytesseract.
+    
+    Every page pays for process startup and language data loading; this is
+    the reference output the other engines are compared with.
+    """
+    name = 'tesseract'
+    
+    def __init__(self, tesseract_cmd='/usr/local/bin/tesseract', lang=None):
+        self.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+    
+    def ocr_files(self, image_paths):
+        pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        return [pytesseract.image_to_string(path, lang=self.lang) for path in image_paths]
+
+
+class TesseractBatchEngine(TesseractEngine):
+    """
+    Runs one tesseract process per batch of page images.
+    
+    The images are passed to tesseract in a list file, so language data is
+    loaded once per batch. Output matches TesseractEngine page for page.
+    """
+    name = 'tesseract-batch'
+    
+    def ocr_files(self, image_paths):
+        if not image_paths:
+            return []
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            list_path = os.path.join(work_dir, 'pages.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write("".join(f"{os.path.abspath(path)}\n" for path in image_paths))
+            
+            output_base = os.path.join(work_dir, 'output')
+            command = [self.tesseract_cmd, list_path, output_base]
+            if self.lang:
+                command += ['-l', self.lang]
+            command.append('txt')
+            
+            result = subprocess.run(command, capture_output=True, check=False)
+            if result.returncode:
+                error = result.stderr.decode('utf-8', errors='replace').strip()
+                raise RuntimeError(f"Tesseract batch OCR error: {error}")
+            
+            with open(f"{output_base}.txt", 'rb') as f:
+                output = f.read().decode('utf-8')
+        
+        return split_pages(output, len(image_paths))
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    Runs Tesseract in-process through tesserocr.
+    
+    The language data is loaded when the engine is created and kept for
+    its lifetime, so no process is started per page or per batch.
+    tesserocr calls the Tesseract library it was built against, so the
+    tesseract_cmd argument other engines use is accepted and ignored.
+    """
+    name = 'tesserocr'
+    
+    def __init__(self, _tesseract_cmd=None, lang=None):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.api = tesserocr.PyTessBaseAPI(lang=lang or 'eng')
+    
+    def ocr_files(self, image_paths):
+        texts = []
+        for path in image_paths:
+            self.api.SetImageFile(path)
+            texts.append(self.api.GetUTF8Text())
+        return texts
+    
+    def close(self):
+        self.api.End()
+
+
+def split_pages(output, page_count):
+    """
+    Split multi-image tesseract output into one text per image.
+    
+    Depending on its version, tesseract writes the form feed page separator
+    after every page or only between pages. Each text is returned as a
+    single-image run of the same tesseract would have written it.
+    
+    Args:
+        output: Text output of one tesseract run over several images
+        page_count: Number of images in the run
+    
+    Returns:
+        List of texts, one per image
+    """
+    parts = output.split('\f')
+    if len(parts) == page_count + 1 and not parts[-1]:
+        return [f"{part}\f" for part in parts[:-1]]
+    if len(parts) == page_count:
+        return parts
+    raise RuntimeError(
+        f"Tesseract batch OCR returned {len(parts)} pages for {page_count} images"
+    )
+
+
+def page_cache_key(image_path, **settings):
+    """
+    Build the page cache key for a rasterized page and the OCR settings.
+    
+    The key hashes decoded pixels rather than file bytes, so the same page
+    rendered into differently encoded image files still shares one entry.
+    
+    Args:
+        image_path: Path to the page image
+        **settings: OCR settings that affect the output (engine, version, DPI)
+    
+    Returns:
+        Hex digest string
+    """
+    with Image.open(image_path) as image:
+        pixels = hashlib.sha256(image.tobytes())
+        pixels.update(f"{image.mode}:{image.size}".encode('utf-8'))
+    key_data = json.dumps(
+        {'pixels': pixels.hexdigest(), 'settings': settings},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+def available_engines():
+    """
+    List the OCR engines that can run here.
+    
+    Returns:
+        Tuple of engine names, fastest first
+    """
+    return tuple(name for name in OCR_ENGINES if name != 'tesserocr' or tesserocr is not None)
+
+
+def resolve_engine(name=DEFAULT_OCR_ENGINE):
+    """
+    Translate an engine argument into a concrete engine name.
+    
+    Args:
+        name: Engine name from OCR_ENGINES, or 'auto' / None
+    
+    Returns:
+        Engine name as string
+    """
+    if name in (None, 'auto'):
+        return available_engines()[0]
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+    return name
+
+
+def create_engine(name=DEFAULT_OCR_ENGINE, tesseract_cmd='/usr/local/bin/tesseract', lang=None):
+    """
+    Create an OCR engine.
+    
+    Args:
+        name: Engine name from OCR_ENGINES, or 'auto' for the fastest installed
+        tesseract_cmd: Path to tesseract executable (not used by 'tesserocr')
+        lang: Tesseract language code(s) such as 'eng' or 'eng+deu'
+    
+    Returns:
+        OcrEngine instance (use as a context manager or call close())
+    """
+    engines = {
+        'tesserocr': TesserocrEngine,
+        'tesseract-batch': TesseractBatchEngine,
+        'tesseract': TesseractEngine
+    }
+    return engines[resolve_engine(name)](tesseract_cmd, lang)
+
+
+def init_worker(name, tesseract_cmd, lang=None):
+    """Process pool initializer: create the worker's engine once for all its pages."""
+    global _worker_engine
+    _worker_engine = create_engine(name, tesseract_cmd, lang)
+
+
+def ocr_files_in_worker(image_paths):
+    """Worker: OCR image files with the engine created by init_worker()."""
+    return _worker_engine.ocr_files(image_paths)
@@ -0,0 +1,40 @@
+"""
+Parallel Utilities Module
+Contains helpers shared by the process pools that split documents over workers.
+"""
+import os
+
+# Each worker receives several smaller slices of pages or chapters instead
+# of one large one, which balances uneven items and lets results stream out
+# earlier.
+SLICES_PER_WORKER = 4
+
+
+def resolve_workers(workers):
+    """
+    Translate a workers argument into a concrete process count.
+    
+    Args:
+        workers: Number of processes, or None for all CPUs
+    
+    Returns:
+        Process count of at least 1
+    """
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def page_slices(items, workers):
+    """
+    Split a list of page numbers or chapters into consecutive slices for the workers.
+    
+    Args:
+        items: List to split
+        workers: Number of worker processes
+    
+    Returns:
+        List of slices, SLICES_PER_WORKER per worker at most
+    """
+    slice_size = max(1, -(-len(items) // (workers * SLICES_PER_WORKER)))
+    return [items[start:start + slice_size] for start in range(0, len(items), slice_size)]
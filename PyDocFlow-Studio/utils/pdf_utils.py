@@ -4,33 +4,386 @@ Contains core functions for PDF text extraction using various methods.
 """
 import fitz  # PyMuPDF
 import pytesseract
-from pdf2image import convert_from_path
-from pdfminer.high_level import extract_text as extract_text_pdfminer
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from utils import cache_utils
+from utils import layout_utils
+from utils import ocr_utils
+from utils import parallel_utils
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from io import BufferedReader, BytesIO, FileIO, StringIO
+from itertools import islice
+import json
+import mmap
 import os
 import re
+import shutil
+import tempfile
+import time
 
+# Documents shorter than this are always extracted serially, since
+# starting a process pool costs more than it saves on a few pages.
+PARALLEL_MIN_PAGES = 16
 
-def extract_text_pymupdf(pdf_file_bytes):
+# Pages handed to an OCR engine in one call. The tesseract-batch engine
+# starts one tesseract process and loads language data once per call, so
+# larger batches spread that startup over more pages.
+OCR_BATCH_PAGES = 16
+
+# OCR rasterizes one batch per worker at a time by default. At most two
+# such windows of page images exist on disk at once, which caps disk and
+# memory use regardless of document length.
+
+# Hybrid mode OCRs a page only when images cover at least this fraction
+# of it and its text layer has fewer than HYBRID_MIN_CHARS characters.
+HYBRID_IMAGE_COVERAGE = 0.5
+HYBRID_MIN_CHARS = 25
+
+# Method names accepted by extract_text()
+PDF_METHODS = ('pymupdf', 'layout', 'pdfminer', 'tesseract', 'hybrid', 'auto')
+
+# Methods that may OCR pages, and so read and fill a per-page OCR cache
+OCR_METHODS = ('tesseract', 'hybrid', 'auto')
+
+# Auto mode times each backend on a few pages spread over the document
+# and runs the fastest one whose output scores at least AUTO_MIN_QUALITY
+AUTO_BACKENDS = ('pymupdf', 'pdfminer', 'tesseract')
+AUTO_PROBE_PAGES = 3
+AUTO_MIN_QUALITY = 0.75
+
+# Quality lost per verify_text() issue when scoring probe output
+AUTO_ISSUE_PENALTIES = {
+    "Text is empty": 1.0,
+    "Irregular whitespace found": 0.1,
+    "Broken lines detected": 0.05,
+    "Missing newlines": 0.2,
+    "Replacement characters found": 0.3,
+    "Control characters found": 0.3
+}
+
+# Backend decisions are remembered per document source in this file,
+# stored next to the extraction cache
+AUTO_DECISIONS_NAME = 'backend_decisions.json'
+
+# Block size used when a stream or buffer has to be copied to disk
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# Issue classes reported by scan_text(). Each chunk is read once and
+# searched per class, since separate simple patterns let the regex engine
+# skip ahead far faster than one alternation. Control characters exclude
+# the whitespace controls (tab, newline, form feed, ...) extractors emit.
+TEXT_ISSUE_PATTERNS = {
+    'whitespace': re.compile(r'\s\s\s\s+'),
+    'broken_lines': re.compile(r'\n(?<=\S\n)(?=\S)'),
+    'replacement_chars': re.compile('\ufffd'),
+    'control_chars': re.compile(r'[\x00-\x08\x0e-\x1f\x7f]')
+}
+TEXT_ISSUES = ('whitespace', 'broken_lines', 'missing_newlines', 'replacement_chars', 'control_chars')
+
+# Offsets kept per issue class, and characters read per chunk from files
+VERIFY_MAX_SAMPLES = 10
+VERIFY_CHUNK_SIZE = 1024 * 1024
+
+# Text repair: other horizontal whitespace becomes plain spaces, space runs
+# collapse, words hyphenated across a line break are rejoined and blank line
+# runs shrink to one paragraph break. Single line breaks left inside a
+# paragraph (the broken_lines issue) become spaces. Each step is a plain
+# string or literal-led regex pass, skipped when there is nothing to fix,
+# which CPython runs far faster than one pattern with a callback.
+REPAIR_SPACE_CHARS = '\t\r\v\xa0\u2002\u2003\u2009\u202f\u3000'
+REPAIR_SPACE_RUN = re.compile('  +')
+REPAIR_HYPHEN = re.compile(r'-(?<=[^\W\d_]-)\n(?=[a-z\u00df-\u00f6\u00f8-\u00ff])')
+REPAIR_BLANK_LINES = re.compile('\n\n\n+')
+# Streams are cut between two characters that are neither whitespace nor
+# hyphens, where no repair step looks across the cut
+REPAIR_CUT = re.compile(r'[^\s-]{2}')
+REPAIR_CUT_SEARCH = 256
+
+# Running headers and footers: the first and last RUNNING_LINE_DEPTH
+# non-blank lines of each page are compared with the pages up to
+# RUNNING_LINE_WINDOW // 2 before and after it, with digit runs normalized
+# so "Page 7 of 90" matches "Page 8 of 90". A line found on at least
+# RUNNING_LINE_THRESHOLD of those pages is dropped. The window follows
+# running heads that change per chapter, and only it is held in memory.
+# Only lines with at least RUNNING_LINE_MIN_LETTERS letters, or page numbers
+# (a single digit run among fewer letters), are candidates, so numeric table
+# rows and list items are kept, and a page is never stripped to nothing.
+RUNNING_LINE_DEPTH = 2
+RUNNING_LINE_WINDOW = 20
+RUNNING_LINE_THRESHOLD = 0.4
+RUNNING_LINE_MIN_PAGES = 4
+RUNNING_LINE_MIN_LETTERS = 3
+RUNNING_LINE_DIGITS = re.compile(r'\d+')
+
+# One item of a page selection string: "7", "3-9", "12-", "-5", "*",
+# each optionally followed by "/step" to sample every step-th page
+PAGE_RANGE_PATTERN = re.compile(r'(?:(\*)|(\d*)(-?)(\d*))(?:/(\d+))?')
+
+
+def select_pages(pages, page_count):
     """
-    Extract text from PDF using PyMuPDF library.
+    Resolve a page selection to sorted 1-based page numbers.
     
     Args:
-        pdf_file_bytes: Bytes from uploaded PDF file
+        pages: None for all pages, an int N for the first N pages, a string
+            of comma-separated items such as "1-5,10,20-" where "*/10" or
+            "1-100/5" sample every n-th page, or an iterable of page numbers
+        page_count: Number of pages in the document
         
     Returns:
-        Extracted text as string or None on error
+        Sorted list of unique page numbers that exist in the document
+    """
+    if pages is None:
+        return list(range(1, page_count + 1))
+    if isinstance(pages, int):
+        if pages < 0:
+            raise ValueError(f"Page count cannot be negative: {pages}")
+        return list(range(1, min(pages, page_count) + 1))
+    if not isinstance(pages, str):
+        return sorted({int(page) for page in pages if 1 <= int(page) <= page_count})
+    
+    selected = set()
+    for item in pages.replace(' ', '').split(','):
+        match = PAGE_RANGE_PATTERN.fullmatch(item)
+        if not item or not match or item in ('-', '/'):
+            raise ValueError(f"Invalid page selection: '{item}'")
+        star, first, dash, last, step = match.groups()
+        if star or (not dash and step):
+            # "*" is every page; "7/3" runs from page 7 to the end
+            start, stop = int(first or 1), page_count
+        else:
+            start = int(first) if first else 1
+            stop = (int(last) if last else page_count) if dash else start
+        selected.update(range(max(start, 1), min(stop, page_count) + 1, int(step or 1)))
+    return sorted(selected)
+
+
+def _source_path(pdf_source):
+    """Return the filesystem path behind a path or real-file source, else None."""
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return os.fspath(pdf_source)
+    if isinstance(pdf_source, (BufferedReader, FileIO)) and os.path.isfile(pdf_source.name):
+        return pdf_source.name
+    return None
+
+
+def _check_source(pdf_source):
+    """Fail fast on missing files and empty sources."""
+    path = _source_path(pdf_source)
+    if path is not None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"PDF file not found: {path}")
+    elif pdf_source is None or (not hasattr(pdf_source, 'read') and not len(pdf_source)):
+        raise ValueError("PDF source cannot be empty")
+
+
+def _as_buffer(pdf_source):
+    """Return a bytes-like view of an in-memory source, without copying where possible."""
+    if isinstance(pdf_source, bytes):
+        return pdf_source
+    if isinstance(pdf_source, BytesIO):
+        return pdf_source.getbuffer()
+    if isinstance(pdf_source, (bytearray, memoryview, mmap.mmap)):
+        return memoryview(pdf_source)
+    # Any other stream has to be read into memory once
+    pdf_source.seek(0)
+    return pdf_source.read()
+
+
+def _copy_to(pdf_source, out_file):
+    """Copy a stream or buffer source into an open binary file in chunks."""
+    if hasattr(pdf_source, 'read') and not isinstance(pdf_source, mmap.mmap):
+        pdf_source.seek(0)
+        shutil.copyfileobj(pdf_source, out_file, SPOOL_CHUNK_SIZE)
+        pdf_source.seek(0)
+        return
+    
+    with memoryview(pdf_source) as view:
+        for offset in range(0, len(view), SPOOL_CHUNK_SIZE):
+            out_file.write(view[offset:offset + SPOOL_CHUNK_SIZE])
+
+
+def spool_to_disk(file_obj, suffix='.pdf'):
+    """
+    Copy an uploaded file to a temporary file in chunks.
+    
+    Spooling once lets every backend (and worker process) open the same
+    file by path instead of holding further copies of the bytes in memory.
+    
+    Args:
+        file_obj: Binary file object or bytes-like buffer
+        suffix: Suffix for the temporary file name
+        
+    Returns:
+        Path to the temporary file (the caller removes it)
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        _copy_to(file_obj, tmp)
+        return tmp.name
+
+
+@contextmanager
+def _as_path(pdf_source):
+    """Yield a filesystem path for any source, spooling to a temp file only when needed."""
+    path = _source_path(pdf_source)
+    if path is not None:
+        yield path
+        return
+    
+    temp_file = None
+    try:
+        temp_file = spool_to_disk(pdf_source)
+        yield temp_file
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass  # File already deleted or not accessible
+
+
+@contextmanager
+def _open_binary(pdf_source):
+    """Yield a seekable binary file object for any source."""
+    path = _source_path(pdf_source)
+    if path is not None:
+        with open(path, 'rb') as fp:
+            yield fp
+    elif hasattr(pdf_source, 'read'):
+        pdf_source.seek(0)
+        yield pdf_source
+    else:
+        yield BytesIO(pdf_source)
+
+
+def _open_fitz(pdf_source):
+    """Open a PyMuPDF document from a path, file object or buffer."""
+    path = _source_path(pdf_source)
+    if path is not None:
+        return fitz.open(path, filetype="pdf")
+    return fitz.open(stream=_as_buffer(pdf_source), filetype="pdf")
+
+
+def _iter_parallel_pages(slice_func, pdf_file_path, page_numbers, workers):
+    """
+    Extract page slices in a process pool and yield pages in document order.
+    
+    Args:
+        slice_func: Module-level function (pdf_file_path, page_numbers) -> list of texts
+        pdf_file_path: Path each worker opens the document from
+        page_numbers: Sorted 1-based page numbers to extract
+        workers: Number of worker processes
+        
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    slices = parallel_utils.page_slices(page_numbers, workers)
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(slices)))
+    try:
+        futures = [executor.submit(slice_func, pdf_file_path, chunk) for chunk in slices]
+        for chunk, future in zip(slices, futures):
+            yield from zip(chunk, future.result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _tesseract_version(tesseract_cmd):
+    """Return the Tesseract version string, or 'unknown' if it cannot be run."""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except (OSError, RuntimeError):
+        return 'unknown'
+
+
+def cache_key(cache, source, method, tesseract_cmd=None, **params):
     """
-    if not pdf_file_bytes:
-        raise ValueError("PDF file bytes cannot be empty")
+    Build the extraction cache key for a document, method and parameters.
     
+    Args:
+        cache: ExtractionCache instance
+        source: PDF path, file object or bytes-like buffer
+        method: Extraction method name ('pymupdf', 'pdfminer', 'tesseract')
+        tesseract_cmd: Path to tesseract executable, for OCR methods
+        **params: Other parameters that affect the output, such as pages
+        
+    Returns:
+        Cache key string
+    """
+    if params.get('pages') is not None:
+        # Equivalent selections ("1-3" and 3) share one cache entry
+        params['pages'] = select_pages(params['pages'], get_page_count(source))
+    if tesseract_cmd is not None:
+        params['tesseract_version'] = _tesseract_version(tesseract_cmd)
+        params['ocr_engine'] = ocr_utils.resolve_engine(params.get('ocr_engine'))
+    return cache.make_key(source, method, **params)
+
+
+def get_page_count(pdf_source):
+    """
+    Count the pages of a PDF using PyMuPDF.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        
+    Returns:
+        Number of pages as integer
+    """
+    _check_source(pdf_source)
+    
+    try:
+        with _open_fitz(pdf_source) as pdf_document:
+            return pdf_document.page_count
+    except (RuntimeError, ValueError) as e:
+        raise ValueError(f"PyMuPDF page count error: {str(e)}") from e
+
+
+def _pymupdf_slice(pdf_file_path, page_numbers):
+    """Worker: extract the given 1-based pages of a PDF with PyMuPDF."""
+    with fitz.open(pdf_file_path, filetype="pdf") as pdf_document:
+        return [pdf_document.load_page(n - 1).get_text("text") for n in page_numbers]
+
+
+def iter_pages_pymupdf(pdf_source, workers=1, pages=None):
+    """
+    Extract text from PDF page by page using PyMuPDF library.
+    
+    Pages are yielded as soon as they are extracted, so callers can show
+    progress or write output without waiting for the whole document.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        pages: Page selection, see select_pages (default: all pages)
+        
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    _check_source(pdf_source)
+    
+    workers = parallel_utils.resolve_workers(workers)
     pdf_document = None
     try:
-        pdf_document = fitz.open(stream=pdf_file_bytes, filetype="pdf")
-        text = ""
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document.load_page(page_num)
-            text += page.get_text("text")
-        return text
+        pdf_document = _open_fitz(pdf_source)
+        page_numbers = select_pages(pages, pdf_document.page_count)
+        
+        if workers > 1 and len(page_numbers) >= PARALLEL_MIN_PAGES:
+            pdf_document.close()
+            pdf_document = None
+            with _as_path(pdf_source) as pdf_path:
+                yield from _iter_parallel_pages(_pymupdf_slice, pdf_path, page_numbers, workers)
+            return
+        
+        for page_number in page_numbers:
+            page = pdf_document.load_page(page_number - 1)
+            yield page_number, page.get_text("text")
     except (RuntimeError, ValueError) as e:
         raise ValueError(f"PyMuPDF extraction error: {str(e)}") from e
     finally:
@@ -38,65 +391,1186 @@ def extract_text_pymupdf(pdf_file_bytes):
             pdf_document.close()
 
 
-def extract_text_pdfminer_six(pdf_file_path):
+def extract_text_pymupdf(pdf_source, workers=1, cache=None, pages=None, strip_running=False):
     """
-    Extract text from PDF using pdfminer.six library.
+    Extract text from PDF using PyMuPDF library.
     
     Args:
-        pdf_file_path: Path to PDF file
+        pdf_source: PDF path, file object or bytes-like buffer
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        strip_running: Remove running headers and footers, see strip_running_lines
         
     Returns:
         Extracted text as string or None on error
     """
-    if not pdf_file_path or not os.path.exists(pdf_file_path):
-        raise FileNotFoundError(f"PDF file not found: {pdf_file_path}")
+    if cache is not None:
+        _check_source(pdf_source)
+        return cache.get_or_compute(
+            cache_key(cache, pdf_source, 'pymupdf', pages=pages, strip_running=strip_running),
+            lambda: extract_text_pymupdf(pdf_source, workers, pages=pages,
+                                         strip_running=strip_running)
+        )
+    pages = iter_pages_pymupdf(pdf_source, workers, pages=pages)
+    if strip_running:
+        pages = strip_running_lines(pages)
+    return "".join(text for _, text in pages)
+
+
+def extract_spans_pymupdf(pdf_source, pages=None):
+    """
+    Extract positioned text spans from PDF using PyMuPDF.
+    
+    Keeps the coordinates, font, size and block/line structure that plain
+    text extraction discards, in a compact layout_utils.SpanTable.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        pages: Page selection, see select_pages (default: all pages)
+        
+    Returns:
+        SpanTable with the spans of the selected pages
+    """
+    _check_source(pdf_source)
+    
+    table = layout_utils.SpanTable()
+    try:
+        with _open_fitz(pdf_source) as pdf_document:
+            for page_number in select_pages(pages, pdf_document.page_count):
+                page = pdf_document.load_page(page_number - 1)
+                table.add_page(page_number, page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT))
+    except (RuntimeError, ValueError) as e:
+        raise ValueError(f"PyMuPDF layout extraction error: {str(e)}") from e
+    return table
+
+
+def iter_pages_layout(pdf_source, pages=None):
+    """
+    Extract text from PDF page by page in reading order, following columns.
+    
+    Only one page's spans are held at a time.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        pages: Page selection, see select_pages (default: all pages)
+        
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    _check_source(pdf_source)
     
     try:
-        return extract_text_pdfminer(pdf_file_path)
+        with _open_fitz(pdf_source) as pdf_document:
+            for page_number in select_pages(pages, pdf_document.page_count):
+                table = layout_utils.SpanTable()
+                page = pdf_document.load_page(page_number - 1)
+                table.add_page(page_number, page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT))
+                yield from layout_utils.iter_page_texts(table)
+    except (RuntimeError, ValueError) as e:
+        raise ValueError(f"PyMuPDF layout extraction error: {str(e)}") from e
+
+
+def extract_text_layout(pdf_source, cache=None, pages=None, strip_running=False):
+    """
+    Extract text from PDF in reading order, following columns.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        strip_running: Remove running headers and footers, see strip_running_lines
+        
+    Returns:
+        Extracted text as string
+    """
+    if cache is not None:
+        _check_source(pdf_source)
+        return cache.get_or_compute(
+            cache_key(cache, pdf_source, 'layout', pages=pages, strip_running=strip_running),
+            lambda: extract_text_layout(pdf_source, pages=pages, strip_running=strip_running)
+        )
+    pages = iter_pages_layout(pdf_source, pages=pages)
+    if strip_running:
+        pages = strip_running_lines(pages)
+    return "".join(text for _, text in pages)
+
+
+def _pdfminer_pages(fp, page_indices=None, maxpages=0):
+    """
+    Extract pages with pdfminer.six, one text string per page.
+    
+    Uses the same converter setup as pdfminer.high_level.extract_text, so
+    joining the pages gives exactly the output of that function.
+    """
+    with StringIO() as output_string:
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, output_string, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        
+        for page in PDFPage.get_pages(fp, page_indices, maxpages=maxpages):
+            interpreter.process_page(page)
+            yield output_string.getvalue()
+            output_string.seek(0)
+            output_string.truncate(0)
+
+
+def _pdfminer_slice(pdf_file_path, page_numbers):
+    """Worker: extract the given 1-based pages of a PDF with pdfminer.six."""
+    with open(pdf_file_path, 'rb') as fp:
+        return list(_pdfminer_pages(fp, {n - 1 for n in page_numbers}))
+
+
+def iter_pages_pdfminer(pdf_source, workers=1, pages=None):
+    """
+    Extract text from PDF page by page using pdfminer.six library.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        pages: Page selection, see select_pages (default: all pages)
+        
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    _check_source(pdf_source)
+    
+    try:
+        workers = parallel_utils.resolve_workers(workers)
+        page_numbers = None
+        if pages is not None or workers > 1:
+            page_numbers = select_pages(pages, get_page_count(pdf_source))
+        
+        if workers > 1 and len(page_numbers) >= PARALLEL_MIN_PAGES:
+            with _as_path(pdf_source) as pdf_path:
+                yield from _iter_parallel_pages(_pdfminer_slice, pdf_path, page_numbers, workers)
+            return
+        
+        with _open_binary(pdf_source) as fp:
+            if page_numbers is None:
+                yield from enumerate(_pdfminer_pages(fp), 1)
+            elif page_numbers == list(range(1, len(page_numbers) + 1)):
+                # A leading run stops parsing after the last requested page
+                yield from zip(page_numbers, _pdfminer_pages(fp, maxpages=len(page_numbers)))
+            else:
+                yield from zip(page_numbers, _pdfminer_pages(fp, {n - 1 for n in page_numbers}))
     except (IOError, OSError) as e:
         raise IOError(f"pdfminer.six extraction error: {str(e)}") from e
 
 
-def extract_text_tesseract(pdf_file_bytes, tesseract_cmd='/usr/local/bin/tesseract'):
+def extract_text_pdfminer_six(pdf_source, workers=1, cache=None, pages=None, strip_running=False):
+    """
+    Extract text from PDF using pdfminer.six library.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        strip_running: Remove running headers and footers, see strip_running_lines
+        
+    Returns:
+        Extracted text as string or None on error
+    """
+    if cache is not None:
+        _check_source(pdf_source)
+        return cache.get_or_compute(
+            cache_key(cache, pdf_source, 'pdfminer', pages=pages, strip_running=strip_running),
+            lambda: extract_text_pdfminer_six(pdf_source, workers, pages=pages,
+                                              strip_running=strip_running)
+        )
+    pages = iter_pages_pdfminer(pdf_source, workers, pages=pages)
+    if strip_running:
+        pages = strip_running_lines(pages)
+    return "".join(text for _, text in pages)
+
+
+def _collect_ocr_window(pending_window, engine, page_cache, in_flight, previous_texts):
+    """
+    Wait for one queued OCR window, cache new pages, delete its images and return [(page_number, text)].
+    
+    Pages repeating a page OCR'd in this window or the previous one take its
+    text. Afterwards this window's OCR'd pages are dropped from in_flight
+    (later windows find them in the page cache) and replace previous_texts.
+    """
+    images, texts, keys, duplicates, batches = pending_window
+    try:
+        ocr_texts = {}
+        for batch, future in batches:
+            if future is None:
+                batch_texts = engine.ocr_files([image_path for _, image_path in batch])
+            else:
+                batch_texts = future.result()
+            for (page_number, _), text in zip(batch, batch_texts):
+                texts[page_number] = ocr_texts[page_number] = text
+                if page_cache is not None:
+                    page_cache.put(keys[page_number], text)
+                    in_flight.pop(keys[page_number], None)
+        for page_number, first_page in duplicates.items():
+            texts[page_number] = texts[first_page] if first_page in texts else previous_texts[first_page]
+        previous_texts.clear()
+        previous_texts.update(ocr_texts)
+    finally:
+        for _, image_path in images:
+            os.remove(image_path)
+    return [(page_number, texts[page_number]) for page_number, _ in images]
+
+
+def _update_ocr_stats(ocr_stats, hits, misses):
+    """Add one window's page cache hits and misses to a job's OCR stats."""
+    if ocr_stats is None:
+        return
+    ocr_stats['pages'] = ocr_stats.get('pages', 0) + hits + misses
+    ocr_stats['cache_hits'] = ocr_stats.get('cache_hits', 0) + hits
+    ocr_stats['cache_misses'] = ocr_stats.get('cache_misses', 0) + misses
+    ocr_stats['hit_rate'] = ocr_stats['cache_hits'] / ocr_stats['pages'] if ocr_stats['pages'] else 0.0
+
+
+def _page_runs(page_numbers):
+    """Group sorted 1-based page numbers into (first, last) runs of consecutive pages."""
+    runs = []
+    for page_number in page_numbers:
+        if runs and runs[-1][1] == page_number - 1:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    return runs
+
+
+def _iter_ocr_pages(pdf_file_path, page_numbers, tesseract_cmd, dpi, workers, window,
+                    ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE, page_cache=None, ocr_stats=None):
+    """
+    OCR the given pages of a PDF file in bounded windows.
+    
+    Pages are rasterized in windows straight to temporary PNG files and
+    OCR'd while the next window is rasterized. Only two windows of images
+    exist at a time, so memory stays bounded. A window holds one batch of
+    OCR_BATCH_PAGES pages per worker by default, and is split into one batch
+    per worker. Every worker keeps a single OCR engine for its lifetime and
+    takes batches from the pool's queue, so language data is loaded once per
+    batch at most rather than once per page.
+    
+    With a page cache, every rendered page is looked up by its pixel hash
+    first, so pages seen before in any document are not OCR'd again. Pages
+    repeating one still being OCR'd in a pending window wait for its text
+    instead of being OCR'd twice.
+    
+    Args:
+        pdf_file_path: Path to PDF file
+        page_numbers: Sorted 1-based page numbers to OCR
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages
+        workers: Number of OCR processes
+        window: Number of pages rasterized at a time
+            (None: workers * OCR_BATCH_PAGES)
+        ocr_engine: Engine name, see ocr_utils.OCR_ENGINES
+        page_cache: Optional ExtractionCache for per-page OCR results
+        ocr_stats: Optional dict updated with pages, cache_hits, cache_misses
+            and hit_rate for this job
+        
+    Yields:
+        Tuples of (page_number, text) in page order
+    """
+    engine_args = (ocr_utils.resolve_engine(ocr_engine), tesseract_cmd)
+    window = window or workers * OCR_BATCH_PAGES
+    page_settings = {}
+    if page_cache is not None:
+        page_settings = {
+            'engine': engine_args[0],
+            'tesseract_version': _tesseract_version(tesseract_cmd),
+            'dpi': dpi
+        }
+    
+    executor = None
+    engine = None
+    try:
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=ocr_utils.init_worker,
+                initargs=engine_args
+            )
+        else:
+            engine = ocr_utils.create_engine(*engine_args)
+        
+        with tempfile.TemporaryDirectory() as image_dir:
+            pending = deque()
+            in_flight = {}  # Page key -> first page OCR'd with it in a pending window
+            previous_texts = {}  # Texts OCR'd in the last collected window
+            for window_start in range(0, len(page_numbers), window):
+                window_pages = page_numbers[window_start:window_start + window]
+                images = []
+                for first_page, last_page in _page_runs(window_pages):
+                    image_paths = convert_from_path(
+                        pdf_file_path,
+                        dpi=dpi,
+                        first_page=first_page,
+                        last_page=last_page,
+                        output_folder=image_dir,
+                        fmt='png',
+                        paths_only=True
+                    )
+                    images.extend(enumerate(image_paths, first_page))
+                
+                texts = {}
+                keys = {}
+                duplicates = {}  # Repeated page -> first page like it still being OCR'd
+                missing = []
+                for page_number, image_path in images:
+                    if page_cache is not None:
+                        key = ocr_utils.page_cache_key(image_path, **page_settings)
+                        keys[page_number] = key
+                        first_page = in_flight.get(key)
+                        if first_page is not None:
+                            duplicates[page_number] = first_page
+                            continue
+                        text = page_cache.get(key)
+                        if text is not None:
+                            texts[page_number] = text
+                            continue
+                        in_flight[key] = page_number
+                    missing.append((page_number, image_path))
+                _update_ocr_stats(ocr_stats, len(images) - len(missing), len(missing))
+                
+                batches = []
+                if missing:
+                    batch_size = -(-len(missing) // workers)
+                    for batch_start in range(0, len(missing), batch_size):
+                        batch = missing[batch_start:batch_start + batch_size]
+                        future = None
+                        if executor:
+                            future = executor.submit(
+                                ocr_utils.ocr_files_in_worker,
+                                [image_path for _, image_path in batch]
+                            )
+                        batches.append((batch, future))
+                pending.append((images, texts, keys, duplicates, batches))
+                
+                # Drain the previous window while this one is being OCR'd
+                while len(pending) > 1:
+                    yield from _collect_ocr_window(pending.popleft(), engine, page_cache,
+                                                   in_flight, previous_texts)
+            
+            while pending:
+                yield from _collect_ocr_window(pending.popleft(), engine, page_cache,
+                                               in_flight, previous_texts)
+    finally:
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if engine:
+            engine.close()
+
+
+def iter_pages_tesseract(pdf_source, tesseract_cmd='/usr/local/bin/tesseract',
+                         dpi=200, workers=1, window=None, pages=None,
+                         ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE, page_cache=None,
+                         ocr_stats=None):
+    """
+    Extract text from PDF page by page using Tesseract OCR (for scanned PDFs).
+    
+    Pages are rasterized and OCR'd in windows of `window` pages, so memory
+    use stays bounded regardless of document length. By default a window
+    holds one batch of OCR_BATCH_PAGES pages per worker. With a page cache,
+    pages already OCR'd in any document are reused instead of OCR'd again.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages
+        workers: Number of OCR processes (1 runs serially, None uses all CPUs)
+        window: Number of pages rasterized at a time
+            (default: workers * OCR_BATCH_PAGES)
+        pages: Page selection, see select_pages (default: all pages)
+        ocr_engine: Engine name, see ocr_utils.OCR_ENGINES ('auto' picks the fastest)
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with pages, cache_hits, cache_misses
+            and hit_rate for this job
+        
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    _check_source(pdf_source)
+    
+    try:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        
+        with _as_path(pdf_source) as pdf_path:
+            page_count = pdfinfo_from_path(pdf_path)['Pages']
+            yield from _iter_ocr_pages(
+                pdf_path,
+                select_pages(pages, page_count),
+                tesseract_cmd,
+                dpi,
+                parallel_utils.resolve_workers(workers),
+                max(1, int(window)) if window else None,
+                ocr_engine,
+                page_cache,
+                ocr_stats
+            )
+    except (IOError, OSError, RuntimeError,
+            PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError) as e:
+        raise RuntimeError(f"Tesseract OCR extraction error: {str(e)}") from e
+
+
+def extract_text_tesseract(pdf_source, tesseract_cmd='/usr/local/bin/tesseract',
+                           dpi=200, workers=1, cache=None, pages=None,
+                           ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE, page_cache=None,
+                           ocr_stats=None, strip_running=False):
     """
     Extract text from PDF using Tesseract OCR (for scanned PDFs).
     
     Args:
-        pdf_file_bytes: Bytes from uploaded PDF file
+        pdf_source: PDF path, file object or bytes-like buffer
         tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages
+        workers: Number of OCR processes (1 runs serially, None uses all CPUs)
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        ocr_engine: Engine name, see ocr_utils.OCR_ENGINES ('auto' picks the fastest)
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with this job's page cache hit rate
+        strip_running: Remove running headers and footers, see strip_running_lines
         
     Returns:
         Extracted text as string or None on error
     """
-    if not pdf_file_bytes:
-        raise ValueError("PDF file bytes cannot be empty")
+    if cache is not None:
+        _check_source(pdf_source)
+        return cache.get_or_compute(
+            cache_key(cache, pdf_source, 'tesseract', tesseract_cmd, dpi=dpi,
+                      pages=pages, ocr_engine=ocr_engine, strip_running=strip_running),
+            lambda: extract_text_tesseract(pdf_source, tesseract_cmd, dpi, workers,
+                                           pages=pages, ocr_engine=ocr_engine,
+                                           page_cache=page_cache, ocr_stats=ocr_stats,
+                                           strip_running=strip_running)
+        )
+    pages = iter_pages_tesseract(pdf_source, tesseract_cmd, dpi=dpi, workers=workers,
+                                 pages=pages, ocr_engine=ocr_engine,
+                                 page_cache=page_cache, ocr_stats=ocr_stats)
+    if strip_running:
+        pages = strip_running_lines(pages)
+    return "\n".join(text for _, text in pages)
+
+
+def _image_coverage(page):
+    """Return the fraction of a PyMuPDF page area covered by images (0.0 - 1.0)."""
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if not page_area:
+        return 0.0
+    
+    covered = 0.0
+    for image in page.get_image_info():
+        bbox = fitz.Rect(image['bbox']) & page_rect
+        if not bbox.is_empty:
+            covered += bbox.width * bbox.height
+    return min(covered / page_area, 1.0)
+
+
+def classify_pages(pdf_source, min_chars=HYBRID_MIN_CHARS,
+                   image_coverage=HYBRID_IMAGE_COVERAGE, pages=None):
+    """
+    Decide per page whether the embedded text layer is usable or OCR is needed.
     
-    import tempfile
-    temp_file = None
+    A page is sent to OCR when images cover at least `image_coverage` of it
+    and its text layer has fewer than `min_chars` non-whitespace characters.
+    Pages without images always use the text layer, even when blank.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        min_chars: Minimum characters for a text layer to count as usable
+        image_coverage: Fraction of the page covered by images that marks a scan
+        pages: Page selection, see select_pages (default: all pages)
+        
+    Returns:
+        List of dicts with page, method ('text' or 'ocr'), chars and image_coverage
+    """
+    _check_source(pdf_source)
+    
+    report = []
     try:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        with _open_fitz(pdf_source) as pdf_document:
+            for page_number in select_pages(pages, pdf_document.page_count):
+                page = pdf_document.load_page(page_number - 1)
+                chars = sum(not c.isspace() for c in page.get_text("text"))
+                coverage = _image_coverage(page)
+                needs_ocr = coverage >= image_coverage and chars < min_chars
+                report.append({
+                    'page': page_number,
+                    'method': 'ocr' if needs_ocr else 'text',
+                    'chars': chars,
+                    'image_coverage': round(coverage, 3)
+                })
+    except (RuntimeError, ValueError) as e:
+        raise ValueError(f"PyMuPDF page analysis error: {str(e)}") from e
+    return report
+
+
+def iter_pages_hybrid(pdf_source, tesseract_cmd='/usr/local/bin/tesseract',
+                      dpi=200, workers=1, report=None, ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE,
+                      page_cache=None, ocr_stats=None):
+    """
+    Extract text using the embedded text layer and OCR only image-only pages.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize OCR pages
+        workers: Number of OCR processes (1 runs serially, None uses all CPUs)
+        report: Page report from classify_pages (computed when omitted)
+        ocr_engine: Engine name, see ocr_utils.OCR_ENGINES ('auto' picks the fastest)
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with this job's page cache hit rate
         
-        # Create temporary file with unique name
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            temp_file = tmp.name
-            tmp.write(pdf_file_bytes)
+    Yields:
+        Tuples of (page_number, text) with 1-based page numbers
+    """
+    if report is None:
+        report = classify_pages(pdf_source)
+    ocr_pages = [entry['page'] for entry in report if entry['method'] == 'ocr']
+    
+    try:
+        with ExitStack() as stack:
+            pdf_document = stack.enter_context(_open_fitz(pdf_source))
+            ocr_results = iter(())
+            if ocr_pages:
+                pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+                pdf_path = stack.enter_context(_as_path(pdf_source))
+                ocr_results = _iter_ocr_pages(
+                    pdf_path, ocr_pages, tesseract_cmd, dpi,
+                    parallel_utils.resolve_workers(workers), None, ocr_engine,
+                    page_cache, ocr_stats
+                )
+            
+            for entry in report:
+                if entry['method'] == 'ocr':
+                    yield next(ocr_results)
+                else:
+                    page = pdf_document.load_page(entry['page'] - 1)
+                    yield entry['page'], page.get_text("text")
+    except (IOError, OSError, RuntimeError, ValueError,
+            PDFInfoNotInstalledError, PDFPageCountError, PDFSyntaxError) as e:
+        raise RuntimeError(f"Hybrid extraction error: {str(e)}") from e
 
-        # Convert PDF pages to images and apply OCR
-        images = convert_from_path(temp_file)
-        extracted_text = []
-        for image in images:
-            text = pytesseract.image_to_string(image)
-            extracted_text.append(text)
 
-        return "\n".join(extracted_text)
-    except (IOError, OSError, RuntimeError) as e:
-        raise RuntimeError(f"Tesseract OCR extraction error: {str(e)}") from e
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            try:
-                os.remove(temp_file)
-            except OSError:
-                pass  # File already deleted or not accessible
+def extract_text_hybrid(pdf_source, tesseract_cmd='/usr/local/bin/tesseract',
+                        dpi=200, workers=1, pages=None, ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE,
+                        page_cache=None, ocr_stats=None, strip_running=False):
+    """
+    Extract text from mixed PDFs, OCR'ing only pages without a usable text layer.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize OCR pages
+        workers: Number of OCR processes (1 runs serially, None uses all CPUs)
+        pages: Page selection, see select_pages (default: all pages)
+        ocr_engine: Engine name, see ocr_utils.OCR_ENGINES ('auto' picks the fastest)
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with this job's page cache hit rate
+        strip_running: Remove running headers and footers, see strip_running_lines
+        
+    Returns:
+        Tuple of (extracted text, per-page report from classify_pages)
+    """
+    report = classify_pages(pdf_source, pages=pages)
+    pages = iter_pages_hybrid(pdf_source, tesseract_cmd, dpi=dpi, workers=workers,
+                              report=report, ocr_engine=ocr_engine,
+                              page_cache=page_cache, ocr_stats=ocr_stats)
+    if strip_running:
+        pages = strip_running_lines(pages)
+    return "".join(text for _, text in pages), report
+
+
+def score_text_quality(page_texts, min_chars=HYBRID_MIN_CHARS):
+    """
+    Score extracted page texts from 0.0 (unusable) to 1.0 (clean).
+    
+    The score is the fraction of pages with at least min_chars characters,
+    reduced by AUTO_ISSUE_PENALTIES for every verify_text() issue found.
+    
+    Args:
+        page_texts: List of texts, one per page
+        min_chars: Minimum non-whitespace characters for a page to count
+        
+    Returns:
+        Quality score as float
+    """
+    if not page_texts:
+        return 0.0
+    
+    filled = sum(
+        sum(not c.isspace() for c in text) >= min_chars for text in page_texts
+    ) / len(page_texts)
+    penalty = sum(AUTO_ISSUE_PENALTIES.get(issue, 0.1) for issue in verify_text("".join(page_texts)))
+    return round(max(0.0, filled * (1.0 - penalty)), 3)
+
+
+def sample_pages(page_count, count=AUTO_PROBE_PAGES):
+    """
+    Pick pages spread evenly over a document, one from the middle of each part.
+    
+    Args:
+        page_count: Number of pages in the document
+        count: Number of pages to pick
+        
+    Returns:
+        Sorted list of 1-based page numbers
+    """
+    count = min(count, page_count)
+    if count <= 0:
+        return []
+    part = page_count // count
+    return [index * page_count // count + part // 2 + 1 for index in range(count)]
+
+
+def document_source(pdf_source):
+    """
+    Identify where a document comes from, for reusing backend decisions.
+    
+    Documents from the same creator and producer application (a scanner,
+    a word processor, a publishing pipeline) usually extract alike. When
+    the PDF has no such metadata the document content hash is used.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        
+    Returns:
+        Source key as string
+    """
+    _check_source(pdf_source)
+    
+    try:
+        with _open_fitz(pdf_source) as pdf_document:
+            metadata = pdf_document.metadata or {}
+    except (RuntimeError, ValueError) as e:
+        raise ValueError(f"PyMuPDF metadata error: {str(e)}") from e
+    
+    creator = (metadata.get('creator') or '').strip()
+    producer = (metadata.get('producer') or '').strip()
+    if creator or producer:
+        return f"{creator} | {producer}"
+    return f"sha256:{cache_utils.hash_source(pdf_source)}"
+
+
+def default_decisions_path():
+    """Return the default path of the backend decisions file."""
+    return os.path.join(cache_utils.default_cache_dir(), AUTO_DECISIONS_NAME)
+
+
+def load_backend_decisions(decisions_path=None):
+    """
+    Load recorded backend decisions.
+    
+    Args:
+        decisions_path: Decisions file (default: default_decisions_path())
+        
+    Returns:
+        Dictionary mapping document source to its decision
+    """
+    decisions_path = decisions_path or default_decisions_path()
+    try:
+        with open(decisions_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_backend_decision(decisions_path, source, decision):
+    """Record one decision, replacing the file atomically."""
+    decisions = load_backend_decisions(decisions_path)
+    decisions[source] = decision
+    
+    # Concurrent writers may drop each other's entries, which only costs a
+    # repeated probe, but never leave a partly written file behind
+    os.makedirs(os.path.dirname(decisions_path) or '.', exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(decisions_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(decisions, f, indent=2, sort_keys=True)
+        os.replace(temp_path, decisions_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def probe_backends(pdf_source, methods=AUTO_BACKENDS, tesseract_cmd='/usr/local/bin/tesseract',
+                   dpi=200, probe_pages=AUTO_PROBE_PAGES):
+    """
+    Time each backend on a few sample pages and score its output.
+    
+    A backend that fails (e.g. Tesseract not installed) is reported with
+    its error and a quality of 0.0 instead of aborting the probe.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        methods: Backends to probe, from AUTO_BACKENDS
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages for OCR
+        probe_pages: Number of sample pages
+        
+    Returns:
+        List of dicts with method, pages, seconds_per_page, quality and error
+    """
+    page_numbers = sample_pages(get_page_count(pdf_source), probe_pages)
+    page_iterators = {
+        'pymupdf': lambda: iter_pages_pymupdf(pdf_source, pages=page_numbers),
+        'pdfminer': lambda: iter_pages_pdfminer(pdf_source, pages=page_numbers),
+        'tesseract': lambda: iter_pages_tesseract(pdf_source, tesseract_cmd, dpi=dpi,
+                                                  pages=page_numbers)
+    }
+    
+    probes = []
+    for method in methods:
+        if method not in page_iterators:
+            raise ValueError(f"Cannot probe extraction method: {method}")
+        
+        probe = {'method': method, 'pages': page_numbers, 'error': None}
+        start = time.perf_counter()
+        try:
+            page_texts = [text for _, text in page_iterators[method]()]
+            probe['quality'] = score_text_quality(page_texts)
+        except (IOError, OSError, RuntimeError, ValueError) as e:
+            probe.update(quality=0.0, error=str(e))
+        probe['seconds_per_page'] = round(
+            (time.perf_counter() - start) / max(len(page_numbers), 1), 4
+        )
+        probes.append(probe)
+    return probes
+
+
+def choose_backend(probes, min_quality=AUTO_MIN_QUALITY):
+    """
+    Pick the fastest probed backend that meets the quality threshold.
+    
+    When no backend meets it, the best scoring one is used instead.
+    
+    Args:
+        probes: Results from probe_backends
+        min_quality: Minimum quality score
+        
+    Returns:
+        Method name as string
+    """
+    usable = [probe for probe in probes if probe['quality'] >= min_quality]
+    if usable:
+        return min(usable, key=lambda probe: probe['seconds_per_page'])['method']
+    return max(probes, key=lambda probe: (probe['quality'], -probe['seconds_per_page']))['method']
+
+
+def select_backend(pdf_source, tesseract_cmd='/usr/local/bin/tesseract', dpi=200,
+                   min_quality=AUTO_MIN_QUALITY, methods=AUTO_BACKENDS,
+                   decisions_path=None, reprobe=False):
+    """
+    Choose a backend for a document, reusing the decision for its source.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages for OCR
+        min_quality: Minimum quality score, see score_text_quality
+        methods: Backends to consider, from AUTO_BACKENDS
+        decisions_path: Decisions file (default: default_decisions_path())
+        reprobe: Probe again even when a decision is recorded
+        
+    Returns:
+        Decision dict with method, source, probes, min_quality, decided_at
+        and probed (False when a recorded decision was reused)
+    """
+    decisions_path = decisions_path or default_decisions_path()
+    source = document_source(pdf_source)
+    
+    decision = load_backend_decisions(decisions_path).get(source)
+    if (not reprobe and decision and decision.get('min_quality') == min_quality
+            and decision.get('method') in methods):
+        return dict(decision, probed=False)
+    
+    probes = probe_backends(pdf_source, methods, tesseract_cmd, dpi)
+    decision = {
+        'method': choose_backend(probes, min_quality),
+        'source': source,
+        'probes': probes,
+        'min_quality': min_quality,
+        'decided_at': datetime.now().isoformat(timespec='seconds')
+    }
+    _save_backend_decision(decisions_path, source, decision)
+    return dict(decision, probed=True)
+
+
+def extract_text_auto(pdf_source, tesseract_cmd='/usr/local/bin/tesseract', dpi=200,
+                      workers=1, cache=None, pages=None, min_quality=AUTO_MIN_QUALITY,
+                      decisions_path=None, ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE,
+                      page_cache=None, ocr_stats=None, strip_running=False):
+    """
+    Extract text with the fastest backend that gives good output for this document.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        tesseract_cmd: Path to tesseract executable
+        dpi: Resolution used to rasterize pages for OCR
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        min_quality: Minimum quality score, see score_text_quality
+        decisions_path: Decisions file (default: default_decisions_path())
+        ocr_engine: OCR engine name, used if Tesseract is selected
+        page_cache: Optional per-page OCR cache, used if Tesseract is selected
+        ocr_stats: Optional dict updated with this job's page cache hit rate
+        strip_running: Remove running headers and footers, see strip_running_lines
+        
+    Returns:
+        Tuple of (extracted text, decision from select_backend)
+    """
+    decision = select_backend(pdf_source, tesseract_cmd, dpi, min_quality,
+                              decisions_path=decisions_path)
+    text = extract_text(pdf_source, decision['method'], tesseract_cmd, dpi, workers,
+                        cache=cache, pages=pages, ocr_engine=ocr_engine,
+                        page_cache=page_cache, ocr_stats=ocr_stats,
+                        strip_running=strip_running)
+    return text, decision
+
+
+def extract_text(pdf_source, method='pymupdf', tesseract_cmd='/usr/local/bin/tesseract',
+                 dpi=200, workers=1, cache=None, pages=None,
+                 ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE, page_cache=None, ocr_stats=None,
+                 strip_running=False):
+    """
+    Extract text from a PDF with the named method.
+    
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        method: One of PDF_METHODS ('pymupdf', 'layout', 'pdfminer', 'tesseract', 'hybrid', 'auto')
+        tesseract_cmd: Path to tesseract executable, for OCR methods
+        dpi: Resolution used to rasterize pages for OCR
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        cache: Optional ExtractionCache consulted before extracting
+        pages: Page selection, see select_pages (default: all pages)
+        ocr_engine: OCR engine name, see ocr_utils.OCR_ENGINES
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with this job's page cache hit rate
+        strip_running: Remove running headers and footers, see strip_running_lines
+        
+    Returns:
+        Extracted text as string
+    """
+    if method not in PDF_METHODS:
+        raise ValueError(f"Unknown extraction method: {method}")
+    
+    if method == 'pymupdf':
+        return extract_text_pymupdf(pdf_source, workers, cache=cache, pages=pages,
+                                    strip_running=strip_running)
+    if method == 'layout':
+        return extract_text_layout(pdf_source, cache=cache, pages=pages,
+                                   strip_running=strip_running)
+    if method == 'pdfminer':
+        return extract_text_pdfminer_six(pdf_source, workers, cache=cache, pages=pages,
+                                         strip_running=strip_running)
+    if method == 'tesseract':
+        return extract_text_tesseract(pdf_source, tesseract_cmd, dpi, workers,
+                                      cache=cache, pages=pages, ocr_engine=ocr_engine,
+                                      page_cache=page_cache, ocr_stats=ocr_stats,
+                                      strip_running=strip_running)
+    if method == 'auto':
+        text, _ = extract_text_auto(pdf_source, tesseract_cmd, dpi, workers,
+                                    cache=cache, pages=pages, ocr_engine=ocr_engine,
+                                    page_cache=page_cache, ocr_stats=ocr_stats,
+                                    strip_running=strip_running)
+        return text
+    text, _ = extract_text_hybrid(pdf_source, tesseract_cmd, dpi, workers, pages=pages,
+                                  ocr_engine=ocr_engine, page_cache=page_cache,
+                                  ocr_stats=ocr_stats, strip_running=strip_running)
+    return text
+
+
+def iter_page_records(pdf_source, method='pymupdf', tesseract_cmd='/usr/local/bin/tesseract',
+                      dpi=200, workers=1, pages=None, ocr_engine=ocr_utils.DEFAULT_OCR_ENGINE,
+                      page_cache=None, ocr_stats=None, strip_running=False):
+    """
+    Extract a PDF page by page into records with offsets and timings.
+
+    Args:
+        pdf_source: PDF path, file object or bytes-like buffer
+        method: One of PDF_METHODS; 'auto' resolves to one backend first
+        tesseract_cmd: Path to tesseract executable, for OCR methods
+        dpi: Resolution used to rasterize pages for OCR
+        workers: Number of worker processes (1 runs serially, None uses all CPUs)
+        pages: Page selection, see select_pages (default: all pages)
+        ocr_engine: OCR engine name, see ocr_utils.OCR_ENGINES
+        page_cache: Optional per-page OCR cache, see cache_utils.open_page_cache
+        ocr_stats: Optional dict updated with this job's page cache hit rate
+        strip_running: Remove running headers and footers, see strip_running_lines
+
+    Yields:
+        Dicts with page, method (the backend that produced the page), offset
+        (of the page in the concatenated page texts), chars, seconds (wall
+        time spent producing the page) and text
+    """
+    if method not in PDF_METHODS:
+        raise ValueError(f"Unknown extraction method: {method}")
+    if method == 'auto':
+        method = select_backend(pdf_source, tesseract_cmd, dpi)['method']
+
+    page_methods = {}
+    if method == 'pymupdf':
+        page_iter = iter_pages_pymupdf(pdf_source, workers, pages=pages)
+    elif method == 'layout':
+        page_iter = iter_pages_layout(pdf_source, pages=pages)
+    elif method == 'pdfminer':
+        page_iter = iter_pages_pdfminer(pdf_source, workers, pages=pages)
+    elif method == 'tesseract':
+        page_iter = iter_pages_tesseract(pdf_source, tesseract_cmd, dpi=dpi, workers=workers,
+                                         pages=pages, ocr_engine=ocr_engine,
+                                         page_cache=page_cache, ocr_stats=ocr_stats)
+    else:
+        report = classify_pages(pdf_source, pages=pages)
+        page_methods = {
+            entry['page']: 'tesseract' if entry['method'] == 'ocr' else 'pymupdf'
+            for entry in report
+        }
+        page_iter = iter_pages_hybrid(pdf_source, tesseract_cmd, dpi=dpi, workers=workers,
+                                      report=report, ocr_engine=ocr_engine,
+                                      page_cache=page_cache, ocr_stats=ocr_stats)
+    if strip_running:
+        page_iter = strip_running_lines(page_iter)
+
+    offset = 0
+    start = time.perf_counter()
+    for page_number, text in page_iter:
+        yield {
+            'page': page_number,
+            'method': page_methods.get(page_number, method),
+            'offset': offset,
+            'chars': len(text),
+            'seconds': round(time.perf_counter() - start, 4),
+            'text': text
+        }
+        offset += len(text)
+        start = time.perf_counter()  # Time spent by the consumer is not counted
+
+
+def write_pages_jsonl(records, output_path, progress=None):
+    """
+    Write page records to a JSONL file as they are extracted.
+
+    Each record is written and flushed as soon as it arrives, so the file
+    can be read while a long job is still running.
+
+    Args:
+        records: Iterable of page records, see iter_page_records
+        output_path: Path of the JSONL file to write
+        progress: Optional callable receiving each record after it is written
+
+    Returns:
+        Dictionary with pages, chars and seconds written
+    """
+    summary = {'pages': 0, 'chars': 0, 'seconds': 0.0}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            summary['pages'] += 1
+            summary['chars'] += record['chars']
+            summary['seconds'] += record['seconds']
+            if progress:
+                progress(record)
+    summary['seconds'] = round(summary['seconds'], 4)
+    return summary
+
+
+def _edge_lines(lines, depth):
+    """Return the indices of the first and last `depth` non-blank lines."""
+    edges = set()
+    for order in (range(len(lines)), range(len(lines) - 1, -1, -1)):
+        found = 0
+        for index in order:
+            if found == depth:
+                break
+            if lines[index].strip():
+                edges.add(index)
+                found += 1
+    return edges
+
+
+def _running_line_key(line):
+    """Hash a line with whitespace collapsed and digit runs normalized, or None if it cannot be a running line."""
+    normalized, digit_runs = RUNNING_LINE_DIGITS.subn('#', ' '.join(line.split()))
+    if digit_runs != 1 and sum(char.isalpha() for char in normalized) < RUNNING_LINE_MIN_LETTERS:
+        return None  # Table row, list item or short label rather than a header or page number
+    return hash(normalized)
+
+
+def strip_running_lines(pages, depth=RUNNING_LINE_DEPTH, window=RUNNING_LINE_WINDOW,
+                        threshold=RUNNING_LINE_THRESHOLD, min_pages=RUNNING_LINE_MIN_PAGES,
+                        stats=None):
+    """
+    Remove repeated headers, footers and page numbers from a page stream.
+    
+    Pages are read once. The edge lines of each page are hashed and counted
+    over a sliding window of neighbouring pages, and a page is yielded as
+    soon as the pages after it in its window have been read, so memory
+    holds only the window regardless of document length. Lines with little
+    text other than digits (except page numbers) are never removed, and a
+    page whose every line would be removed is kept as it is.
+    
+    Args:
+        pages: Iterable of (page_number, text) tuples, e.g. iter_pages_pymupdf()
+        depth: Non-blank lines checked at the top and at the bottom of each page
+        window: Number of neighbouring pages a page is compared with
+        threshold: Fraction of the window's pages a line must appear on
+        min_pages: Windows with fewer pages (short documents) are left unchanged
+        stats: Optional dict updated with pages and lines_removed
+    
+    Yields:
+        Tuples of (page_number, text) without the running lines
+    """
+    half = max(1, window // 2)
+    counts = {}
+    pending = deque()  # (page_number, lines, edges, keys) read but not yet yielded
+    passed = deque()  # Keys of yielded pages still inside the window
+    totals = {'pages': 0, 'lines_removed': 0}
+    
+    def count(keys, step):
+        for key in keys:
+            total = counts.get(key, 0) + step
+            if total:
+                counts[key] = total
+            else:
+                del counts[key]
+    
+    def release():
+        page_number, lines, edges, keys = pending.popleft()
+        window_pages = len(passed) + len(pending) + 1
+        if window_pages >= min_pages:
+            needed = max(2, threshold * window_pages)
+            drop = {index for index, key in edges.items() if counts[key] >= needed}
+            if drop and any(line.strip() for index, line in enumerate(lines) if index not in drop):
+                lines = [line for index, line in enumerate(lines) if index not in drop]
+                totals['lines_removed'] += len(drop)
+    
+        passed.append(keys)
+        if len(passed) > half:
+            count(passed.popleft(), -1)
+        totals['pages'] += 1
+        if stats is not None:
+            stats.update(totals)
+        return page_number, "\n".join(lines)
+    
+    for page_number, text in pages:
+        lines = text.split("\n")
+        edges = {}
+        for index in _edge_lines(lines, depth):
+            key = _running_line_key(lines[index])
+            if key is not None:
+                edges[index] = key
+        keys = set(edges.values())  # A line counts once per page
+        count(keys, 1)
+        pending.append((page_number, lines, edges, keys))
+        if len(pending) > half:
+            yield release()
+    
+    while pending:
+        yield release()
+
+
+def scan_text(chunks, max_samples=VERIFY_MAX_SAMPLES):
+    """
+    Scan text for extraction issues in a single streaming pass.
+    
+    Chunks may split the text anywhere; whitespace runs and broken lines
+    spanning a boundary are still counted once. Only a few characters are
+    carried between chunks, so memory does not grow with the text.
+    
+    Args:
+        chunks: Iterable of text strings
+        max_samples: Number of character offsets kept per issue class
+    
+    Returns:
+        Dictionary with chars, lines, empty and issues, where issues maps
+        each name in TEXT_ISSUES to {'count': int, 'samples': [offsets]}
+    """
+    issues = {name: {'count': 0, 'samples': []} for name in TEXT_ISSUES}
+    chars = newlines = 0
+    has_content = False
+    
+    # tail is the unscanned end of the previous chunk, preceded by one
+    # already scanned context character for the broken line lookbehind
+    tail = ''
+    context = 0
+    base = 0  # Offset of tail[0] in the whole text
+    open_run = False  # Previous chunk ended inside a reported whitespace run
+    
+    def scan(buffer, cut):
+        # No match can straddle cut: the text before a held run ends in a
+        # non-whitespace character, so a newline there cannot break a line
+        for name, pattern in TEXT_ISSUE_PATTERNS.items():
+            # A run continuing from the previous chunk was already reported
+            skip = int(name == 'whitespace' and open_run and bool(pattern.match(buffer, context, cut)))
+            count = len(pattern.findall(buffer, context, cut)) - skip
+            if not count:
+                continue
+            issue = issues[name]
+            issue['count'] += count
+            needed = max_samples - len(issue['samples'])
+            if needed > 0:
+                matches = islice(pattern.finditer(buffer, context, cut), skip, skip + needed)
+                issue['samples'].extend(base + match.start() for match in matches)
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chars += len(chunk)
+        newlines += chunk.count('\n')
+        has_content = has_content or not chunk.isspace()
+        
+        buffer = tail + chunk
+        run_start = max(len(buffer.rstrip()), context)
+        continues_run = open_run and run_start == context
+        
+        # A short trailing whitespace run may still grow into an issue, or
+        # end in a newline that breaks a line, so it is scanned next time
+        held = 0 < len(buffer) - run_start < 4 and not continues_run
+        cut = run_start if held else len(buffer)
+        scan(buffer, cut)
+        
+        open_run = not held and run_start < len(buffer)
+        keep_from = max(cut - 1, 0)
+        context = cut - keep_from
+        base += keep_from
+        tail = buffer[keep_from:]
+    
+    # Whatever is still held at the end of the text is a complete short run
+    scan(tail, len(tail))
+    
+    if chars > 100 and not newlines:
+        issues['missing_newlines']['count'] = 1
+        issues['missing_newlines']['samples'] = [0][:max_samples]
+    
+    return {
+        'chars': chars,
+        'lines': newlines + 1 if chars else 0,
+        'empty': not has_content,
+        'issues': issues
+    }
+
+
+def scan_text_file(text_file_path, chunk_size=VERIFY_CHUNK_SIZE, max_samples=VERIFY_MAX_SAMPLES):
+    """
+    Scan a UTF-8 text file for extraction issues without loading it whole.
+    
+    Bytes that are not valid UTF-8 are decoded as replacement characters
+    and reported as such.
+    
+    Args:
+        text_file_path: Path to text file
+        chunk_size: Characters read per chunk
+        max_samples: Number of character offsets kept per issue class
+    
+    Returns:
+        Dictionary as returned by scan_text()
+    """
+    with open(text_file_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        return scan_text(iter(lambda: f.read(chunk_size), ''), max_samples)
 
 
 def verify_text(text):
@@ -109,22 +1583,110 @@ def verify_text(text):
     Returns:
         List of issues found
     """
-    issues = []
+    stats = scan_text([text] if text else [], max_samples=0)
+    if stats['empty']:
+        return ["Text is empty"]
+    
+    messages = {
+        'whitespace': "Irregular whitespace found",
+        'broken_lines': "Broken lines detected",
+        'missing_newlines': "Missing newlines",
+        'replacement_chars': "Replacement characters found",
+        'control_chars': "Control characters found"
+    }
+    return [messages[name] for name in TEXT_ISSUES if stats['issues'][name]['count']]
+
+
+def _repair_piece(text):
+    """Apply every repair step to text that is not cut inside a repair."""
+    for char in REPAIR_SPACE_CHARS:
+        if char in text:
+            text = text.replace(char, ' ')
+    if '  ' in text:
+        text = REPAIR_SPACE_RUN.sub(' ', text)
+    if ' \n' in text:
+        text = text.replace(' \n', '\n')
+    if '\n ' in text:
+        text = text.replace('\n ', '\n')
+    if '-\n' in text:
+        text = REPAIR_HYPHEN.sub('', text)
+    if '\n\n\n' in text:
+        text = REPAIR_BLANK_LINES.sub('\n\n', text)
+    return TEXT_ISSUE_PATTERNS['broken_lines'].sub(' ', text)
+
+
+def iter_repaired_text(chunks):
+    """
+    Repair text in a single streaming pass.
+    
+    Chunks may split the text anywhere; the output is the same as
+    repair_text() on the whole text. Each chunk is repaired up to its last
+    safe cut, and only the rest is carried into the next chunk.
     
-    if not text or not text.strip():
-        issues.append("Text is empty")
-        return issues
+    Args:
+        chunks: Iterable of text strings
+    
+    Yields:
+        Repaired text strings
+    """
+    tail = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer = tail + chunk
+        
+        cut = None
+        for match in REPAIR_CUT.finditer(buffer, max(len(tail) - 1, len(buffer) - REPAIR_CUT_SEARCH, 0)):
+            cut = match.start() + 1
+        if cut is None:
+            tail = buffer  # No safe cut yet (e.g. a long whitespace run)
+            continue
+        
+        yield _repair_piece(buffer[:cut])
+        tail = buffer[cut:]
+    
+    if tail:
+        yield _repair_piece(tail)
+
+
+def repair_text(text):
+    """
+    Repair common extraction artifacts in text.
     
-    # Check for irregular whitespace
-    if re.search(r'\s{4,}', text):
-        issues.append("Irregular whitespace found")
+    Joins words hyphenated across line breaks, merges wrapped lines into
+    paragraphs and collapses irregular whitespace. Paragraph breaks (blank
+    lines) and form feeds are kept.
     
-    # Check for broken lines
-    if re.search(r'\S\n\S', text):
-        issues.append("Broken lines detected")
+    Args:
+        text: Text string to repair
+        
+    Returns:
+        Repaired text as string
+    """
+    return _repair_piece(text) if text else text
+
+
+def repair_text_file(text_file_path, output_path, chunk_size=VERIFY_CHUNK_SIZE):
+    """
+    Repair a UTF-8 text file into another file without loading it whole.
     
-    # Check for missing newlines
-    if len(text) > 100 and not re.search(r'\n', text):
-        issues.append("Missing newlines")
+    Args:
+        text_file_path: Path to input text file
+        output_path: Path to output text file
+        chunk_size: Characters read per chunk
     
-    return issues
+    Returns:
+        Dictionary with chars_in and chars_out
+    """
+    chars_in = chars_out = 0
+    with open(text_file_path, 'r', encoding='utf-8', errors='replace', newline='') as source, \
+            open(output_path, 'w', encoding='utf-8', newline='') as output:
+        def read_chunks():
+            nonlocal chars_in
+            for chunk in iter(lambda: source.read(chunk_size), ''):
+                chars_in += len(chunk)
+                yield chunk
+        
+        for piece in iter_repaired_text(read_chunks()):
+            chars_out += output.write(piece)
+    return {'chars_in': chars_in, 'chars_out': chars_out}
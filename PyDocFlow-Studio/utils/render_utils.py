@@ -0,0 +1,635 @@
+"""
+Render Utilities Module
+Streaming writers that lay out paragraphs into PDF and Word documents.
+"""
+import hashlib
+import os
+import re
+import sys
+import zipfile
+import zlib
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+import docx
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFontFile, TTFError
+
+# Styled PDF layout: US Letter, one-inch margins, 12 pt text on 15 pt lines
+# and a blank line after each paragraph. A new page starts when the next
+# line would fall below the bottom margin plus PDF_BOTTOM_SLACK.
+PDF_PAGE_SIZE = letter
+PDF_MARGIN = inch
+PDF_FONT_SIZE = 12
+PDF_LEADING = 15
+PDF_BOTTOM_SLACK = 20
+
+# Word widths measured per font are memoized; the memo is emptied when it
+# reaches this many words, which bounds it on unusual vocabularies.
+WORD_WIDTH_CACHE_SIZE = 200000
+
+# Embedded TrueType fonts are cut down to the glyphs a document uses. The
+# subset's cmap table (see TTFontFile.makeSubset) holds at most this many
+# characters; documents using more embed the whole font instead.
+PDF_SUBSET_MAX_CHARS = 32000
+
+# Standard PDF font used when the TrueType font cannot be loaded. It needs
+# no embedding but only covers the Windows-1252 character set.
+FALLBACK_FONT = 'Helvetica'
+
+# Fonts loaded so far in this process, by font path
+_fonts = {}
+
+# Streamed Word documents reuse every part of python-docx's default template
+# except the main document, so styles and page setup match Document().
+# Paragraphs are written to the document part in chunks of DOCX_WRITE_CHUNK.
+DOCX_TEMPLATE_PATH = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+DOCX_DOCUMENT_PART = 'word/document.xml'
+DOCX_WRITE_CHUNK = 1000
+
+# Characters that cannot appear in XML 1.0; both Word writers drop them from
+# paragraphs (see epub_utils.text_to_word_doc)
+DOCX_INVALID_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+# Run content characters that python-docx turns into elements
+DOCX_RUN_BREAKS = re.compile(r'([\t\n\r])')
+
+# Template parts and document head and tail, read once per process
+_docx_template = None
+
+
+class _GlyphHex(dict):
+    """Codepoint -> 4-digit hex glyph id table for str.translate; unknown characters map to glyph 0."""
+    
+    def __missing__(self, codepoint):
+        return '0000'
+
+
+class _CharWidths(dict):
+    """Character -> advance width table; characters missing from the font get the default width."""
+    
+    def __init__(self, widths, default_width):
+        super().__init__(widths)
+        self.default_width = default_width
+    
+    def __missing__(self, char):
+        return self.default_width
+
+
+class PdfFont:
+    """
+    Font metrics and embeddable program, loaded once per process.
+    
+    A TrueType font is embedded as a CID font with Identity-H encoding,
+    so text is written as glyph ids; each document embeds a subset with
+    only the glyphs it uses (see subset()). The fallback is the standard
+    Helvetica font with WinAnsi encoding.
+    """
+    
+    def __init__(self, font_path=None):
+        """
+        Load a font.
+        
+        Args:
+            font_path: Path or name of a TrueType font (None for FALLBACK_FONT)
+        """
+        self.path = font_path
+        self._width_table = None  # Built on first use, see width_table
+        self._word_widths = None
+        if font_path is None:
+            face = pdfmetrics.getFont(FALLBACK_FONT)
+            self.name = FALLBACK_FONT
+            self.embedded = False
+            self.char_widths = {}
+            for code, width in enumerate(face.widths):
+                try:
+                    self.char_widths[ord(bytes([code]).decode('cp1252'))] = width
+                except UnicodeDecodeError:
+                    continue
+            self.default_width = face.widths[ord('?')]
+            return
+        
+        font_file = TTFontFile(font_path)
+        self.font_file = font_file
+        self.name = font_file.name.decode('latin-1')
+        self.embedded = True
+        self.char_to_glyph = font_file.charToGlyph
+        self.char_widths = font_file.charWidths
+        self.default_width = font_file.defaultWidth
+        self.glyph_hex = _GlyphHex(
+            (codepoint, '%04X' % glyph) for codepoint, glyph in font_file.charToGlyph.items()
+        )
+        self.descriptor = (
+            f"/Flags {font_file.flags} /FontBBox [{' '.join(_num(v) for v in font_file.bbox)}] "
+            f"/ItalicAngle {_num(font_file.italicAngle)} /Ascent {_num(font_file.ascent)} "
+            f"/Descent {_num(font_file.descent)} /CapHeight {_num(font_file.capHeight)} "
+            f"/StemV {_num(font_file.stemV)}"
+        )
+    
+    def subset(self, glyph_chars):
+        """
+        Build an embeddable font program holding only the given glyphs.
+        
+        The subset numbers its glyphs from 1 in the order of their original
+        ids. Content streams keep the original glyph ids as CIDs, and the
+        returned CIDToGIDMap maps them to the subset's glyphs.
+        
+        Args:
+            glyph_chars: Dictionary mapping original glyph id -> a character drawn with it
+        
+        Returns:
+            Tuple of (font name, font program, CIDToGIDMap bytes); the whole
+            font is returned, mapped as is, above PDF_SUBSET_MAX_CHARS glyphs
+        """
+        glyphs = sorted(glyph_chars)
+        cid_to_gid = array('H', bytes(2 * (glyphs[-1] + 1 if glyphs else 1)))
+        if len(glyphs) > PDF_SUBSET_MAX_CHARS:
+            with open(self.font_file.filename, 'rb') as f:
+                program = f.read()
+            new_glyphs = glyphs
+        else:
+            program = self.font_file.makeSubset([ord(glyph_chars[glyph]) for glyph in glyphs])
+            new_glyphs = range(1, len(glyphs) + 1)
+        for glyph, new_glyph in zip(glyphs, new_glyphs):
+            cid_to_gid[glyph] = new_glyph
+        if sys.byteorder == 'little':
+            cid_to_gid.byteswap()  # CIDToGIDMap entries are big-endian
+        cid_to_gid = cid_to_gid.tobytes()
+        if new_glyphs is glyphs:
+            return self.name, program, cid_to_gid
+        
+        # Subset fonts are named with a six-letter tag unique to the subset
+        digest = hashlib.sha1(cid_to_gid).digest()
+        tag = ''.join(chr(ord('A') + byte % 26) for byte in digest[:6])
+        return f"{tag}+{self.name}", program, cid_to_gid
+    
+    @property
+    def width_table(self):
+        """Character -> width table in 1/1000 em, built on first use."""
+        if self._width_table is None:
+            self._width_table = _CharWidths(
+                ((chr(codepoint), width) for codepoint, width in self.char_widths.items()),
+                self.default_width
+            )
+            self._word_widths = {}
+        return self._width_table
+    
+    def word_widths(self, words):
+        """
+        Measure words, reusing the widths of words seen before.
+        
+        Args:
+            words: List of strings
+        
+        Returns:
+            List of widths in 1/1000 em
+        """
+        table = self.width_table
+        memo = self._word_widths
+        if len(memo) >= WORD_WIDTH_CACHE_SIZE:
+            memo.clear()
+        widths = []
+        for word in words:
+            width = memo.get(word)
+            if width is None:
+                width = memo[word] = sum(map(table.__getitem__, word))
+            widths.append(width)
+        return widths
+    
+    def text_width(self, text, font_size):
+        """Return the width of text in points at the given size."""
+        return sum(map(self.width_table.__getitem__, text)) * font_size / 1000
+    
+    def encode(self, text):
+        """Return a PDF string operand showing text in this font."""
+        if self.embedded:
+            return b'<' + text.translate(self.glyph_hex).encode('ascii') + b'>'
+        data = text.encode('cp1252', errors='replace')
+        return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _num(value):
+    """Format a number for PDF syntax."""
+    return ('%.3f' % value).rstrip('0').rstrip('.')
+
+
+def load_font(font_path='DejaVuSerif.ttf'):
+    """
+    Return the PdfFont for a TrueType font, loading it on first use.
+    
+    Falls back to FALLBACK_FONT when the font cannot be read or embedded.
+    
+    Args:
+        font_path: Path or name of a TrueType font
+    
+    Returns:
+        PdfFont instance, shared by all documents in this process
+    """
+    font = _fonts.get(font_path)
+    if font is None:
+        try:
+            font = PdfFont(font_path)
+        except (OSError, IOError, RuntimeError, TTFError):
+            font = _fonts.get(None) or PdfFont(None)
+            _fonts[None] = font
+            return font
+        _fonts[font_path] = font
+    return font
+
+
+class PdfStreamWriter:
+    """
+    Write a single-font text PDF to a file or stream page by page.
+    
+    Each page is compressed and written as soon as it ends, so memory does
+    not grow with the document; only an array of object offsets and the set
+    of used characters are kept until close() writes the font, page tree
+    and cross-reference table.
+    """
+    
+    # Objects written at close() have fixed numbers; each page then adds a
+    # content stream and a page object, numbered in order
+    CATALOG, PAGES, FONT, CID_FONT, DESCRIPTOR, FONT_FILE, TO_UNICODE, CID_TO_GID = range(1, 9)
+    
+    # Page tree references and cross-reference entries are written in
+    # chunks of this many, never as one string
+    WRITE_CHUNK = 1024
+    
+    def __init__(self, output, font, page_size=PDF_PAGE_SIZE, font_size=PDF_FONT_SIZE):
+        """
+        Start a PDF.
+        
+        Args:
+            output: Output file path or writable binary file object
+            font: PdfFont used for all text
+            page_size: (width, height) in points
+            font_size: Text size in points
+        """
+        self._owns_file = isinstance(output, (str, bytes)) or hasattr(output, '__fspath__')
+        self._file = open(output, 'wb') if self._owns_file else output
+        self.font = font
+        self.page_size = page_size
+        self.font_size = font_size
+        self.page_count = 0
+        self._first_page_object = self.CID_TO_GID + 1 if font.embedded else self.FONT + 1
+        self._offsets = array('Q', bytes(8 * self._first_page_object))
+        self._position = 0
+        self._used_chars = set()
+        self._page = []
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+    
+    def _write_object(self, number, body, stream=None):
+        """Write an indirect object, with an optional stream after its dictionary."""
+        if number < len(self._offsets):
+            self._offsets[number] = self._position
+        else:
+            self._offsets.append(self._position)
+        self._write(f'{number} 0 obj\n'.encode('ascii') + body)
+        if stream is not None:
+            self._write(b'\nstream\n' + stream + b'\nendstream')
+        self._write(b'\nendobj\n')
+    
+    def draw_line(self, x, y, text):
+        """
+        Add a line of text to the current page.
+        
+        Args:
+            x: Left edge in points
+            y: Baseline in points from the bottom of the page
+            text: Line text without newlines
+        """
+        if self.font.embedded:
+            self._used_chars.update(text)
+        self._page.append(f'1 0 0 1 {_num(x)} {_num(y)} Tm '.encode('ascii') + self.font.encode(text) + b' Tj')
+    
+    def end_page(self):
+        """Write the current page and start a new one."""
+        content = zlib.compress(
+            f'BT /F1 {_num(self.font_size)} Tf\n'.encode('ascii') + b'\n'.join(self._page) + b'\nET'
+        )
+        self._page = []
+        contents = len(self._offsets)
+        page = contents + 1
+        self._write_object(
+            contents, f'<< /Length {len(content)} /Filter /FlateDecode >>'.encode('ascii'), content
+        )
+        self._write_object(
+            page, f'<< /Type /Page /Parent {self.PAGES} 0 R /Contents {contents} 0 R >>'.encode('ascii')
+        )
+        self.page_count += 1
+    
+    def _write_font(self):
+        """Write the font objects for the characters used."""
+        font = self.font
+        if not font.embedded:
+            self._write_object(self.FONT, (
+                f'<< /Type /Font /Subtype /Type1 /BaseFont /{font.name} '
+                f'/Encoding /WinAnsiEncoding >>'
+            ).encode('ascii'))
+            return
+        
+        glyph_chars = {}
+        for char in sorted(self._used_chars):
+            glyph = font.char_to_glyph.get(ord(char), 0)
+            if glyph:
+                glyph_chars.setdefault(glyph, char)
+        widths = ' '.join(
+            f'{glyph} [{_num(round(font.char_widths.get(ord(char), font.default_width)))}]'
+            for glyph, char in sorted(glyph_chars.items())
+        )
+        name, program, cid_to_gid = font.subset(glyph_chars)
+        self._write_object(self.FONT, (
+            f'<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H '
+            f'/DescendantFonts [{self.CID_FONT} 0 R] /ToUnicode {self.TO_UNICODE} 0 R >>'
+        ).encode('ascii'))
+        self._write_object(self.CID_FONT, (
+            f'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} '
+            f'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+            f'/FontDescriptor {self.DESCRIPTOR} 0 R /DW {_num(round(font.default_width))} '
+            f'/W [{widths}] /CIDToGIDMap {self.CID_TO_GID} 0 R >>'
+        ).encode('ascii'))
+        self._write_object(self.DESCRIPTOR, (
+            f'<< /Type /FontDescriptor /FontName /{name} {font.descriptor} '
+            f'/FontFile2 {self.FONT_FILE} 0 R >>'
+        ).encode('ascii'))
+        stream = zlib.compress(program)
+        self._write_object(self.FONT_FILE, (
+            f'<< /Length {len(stream)} /Length1 {len(program)} /Filter /FlateDecode >>'
+        ).encode('ascii'), stream)
+        stream = zlib.compress(cid_to_gid)
+        self._write_object(
+            self.CID_TO_GID, f'<< /Length {len(stream)} /Filter /FlateDecode >>'.encode('ascii'), stream
+        )
+        
+        entries = sorted(glyph_chars.items())
+        cmap = [
+            '/CIDInit /ProcSet findresource begin 12 dict begin begincmap',
+            '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+            '/CMapName /Adobe-Identity-UCS def /CMapType 2 def',
+            '1 begincodespacerange <0000> <FFFF> endcodespacerange',
+        ]
+        for start in range(0, len(entries), 100):
+            block = entries[start:start + 100]
+            cmap.append(f'{len(block)} beginbfchar')
+            cmap.extend(
+                f"<{glyph:04X}> <{char.encode('utf-16-be').hex().upper()}>" for glyph, char in block
+            )
+            cmap.append('endbfchar')
+        cmap.append('endcmap CMapName currentdict /CMap defineresource pop end end')
+        stream = zlib.compress('\n'.join(cmap).encode('ascii'))
+        self._write_object(
+            self.TO_UNICODE, f'<< /Length {len(stream)} /Filter /FlateDecode >>'.encode('ascii'), stream
+        )
+    
+    def close(self):
+        """Finish the last page, write the font, page tree and trailer."""
+        if self._file is None:
+            return
+        if self._page or not self.page_count:
+            self.end_page()
+        width, height = self.page_size
+        self._write_font()
+        self._offsets[self.PAGES] = self._position
+        self._write(f'{self.PAGES} 0 obj\n<< /Type /Pages /Kids ['.encode('ascii'))
+        first_page = self._first_page_object + 1
+        for start in range(0, self.page_count, self.WRITE_CHUNK):
+            stop = min(start + self.WRITE_CHUNK, self.page_count)
+            self._write(''.join(f'{first_page + 2 * index} 0 R ' for index in range(start, stop)).encode('ascii'))
+        self._write((
+            f'] /Count {self.page_count} /MediaBox [0 0 {_num(width)} {_num(height)}] '
+            f'/Resources << /Font << /F1 {self.FONT} 0 R >> >> >>\nendobj\n'
+        ).encode('ascii'))
+        self._write_object(self.CATALOG, f'<< /Type /Catalog /Pages {self.PAGES} 0 R >>'.encode('ascii'))
+        
+        xref_position = self._position
+        size = len(self._offsets)
+        self._write(f'xref\n0 {size}\n0000000000 65535 f \n'.encode('ascii'))
+        for start in range(1, size, self.WRITE_CHUNK):
+            self._write(''.join(
+                f'{offset:010d} 00000 n \n' for offset in self._offsets[start:start + self.WRITE_CHUNK]
+            ).encode('ascii'))
+        self._write(f'trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\n'
+                    f'startxref\n{xref_position}\n%%EOF\n'.encode('ascii'))
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._owns_file and self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _split_long_word(word, font, limit):
+    """Break a word wider than limit (1/1000 em) into pieces that fit."""
+    table = font.width_table
+    pieces = []
+    start = 0
+    width = 0
+    for index, char in enumerate(word):
+        width += table[char]
+        if width > limit and index > start:
+            pieces.append(word[start:index])
+            start, width = index, table[char]
+    pieces.append(word[start:])
+    return pieces
+
+
+def wrap_paragraph(paragraph, font, max_width, font_size=PDF_FONT_SIZE):
+    """
+    Break a paragraph into lines no wider than max_width.
+    
+    Lines are filled greedily at whitespace using the font's glyph widths.
+    Each line end is found with one bisect over the cumulative word widths,
+    so the work per line does not depend on its length in characters.
+    Whitespace runs become single spaces and words wider than a line are
+    split between characters.
+    
+    Args:
+        paragraph: Paragraph text
+        font: PdfFont used for measuring
+        max_width: Line width in points
+        font_size: Text size in points
+    
+    Returns:
+        List of line strings
+    """
+    words = paragraph.split()
+    if not words:
+        return []
+    
+    limit = max_width * 1000 / font_size
+    space = font.width_table[' ']
+    # ends[k] is the width of words[:k] with a space after each word
+    ends = list(accumulate((width + space for width in font.word_widths(words)), initial=0))
+    
+    lines = []
+    start = 0
+    while start < len(words):
+        end = bisect_right(ends, ends[start] + limit + space, start + 1) - 1
+        if end > start:
+            lines.append(' '.join(words[start:end]))
+            start = end
+        else:
+            lines.extend(_split_long_word(words[start], font, limit))
+            start += 1
+    return lines
+
+
+def write_styled_pdf(paragraphs, output, font_path='DejaVuSerif.ttf'):
+    """
+    Lay out paragraphs as a book-like PDF and stream it to a file.
+    
+    Paragraphs are consumed one at a time, wrapped to the text width by
+    font metrics and written as pages fill, so peak memory does not depend
+    on the length of the text.
+    
+    Args:
+        paragraphs: Iterable of paragraph strings
+        output: Output file path or writable binary file object
+        font_path: Path or name of a TrueType font (Helvetica if unavailable)
+    
+    Returns:
+        Dictionary with the number of pages and lines written
+    """
+    width, height = PDF_PAGE_SIZE
+    top, bottom = height - PDF_MARGIN, PDF_MARGIN + PDF_BOTTOM_SLACK
+    line_width = width - 2 * PDF_MARGIN
+    font = load_font(font_path)
+    lines = 0
+    
+    with PdfStreamWriter(output, font) as writer:
+        y = top
+        for paragraph in paragraphs:
+            for line in wrap_paragraph(paragraph, font, line_width):
+                if y < bottom:
+                    writer.end_page()
+                    y = top
+                writer.draw_line(PDF_MARGIN, y, line)
+                lines += 1
+                y -= PDF_LEADING
+            y -= PDF_LEADING
+    return {'pages': writer.page_count, 'lines': lines}
+
+
+def load_docx_template():
+    """
+    Return the Word template, reading it on first use.
+    
+    Returns:
+        Tuple of (list of (part name, bytes) to copy, document head bytes up
+        to the body, document tail bytes from the section properties)
+    
+    Raises:
+        IOError: If the template cannot be read
+    """
+    global _docx_template
+    if _docx_template is None:
+        try:
+            with zipfile.ZipFile(DOCX_TEMPLATE_PATH) as archive:
+                parts = [
+                    (name, archive.read(name)) for name in archive.namelist()
+                    if name != DOCX_DOCUMENT_PART
+                ]
+                document = archive.read(DOCX_DOCUMENT_PART).decode('utf-8')
+        except (OSError, KeyError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+            raise IOError(f"Word template read error: {str(e)}") from e
+        
+        # The template body holds only the section properties
+        document = re.sub(r'>\s+<', '><', document.strip())
+        head, body = document.split('<w:body>', 1)
+        tail = body[body.index('<w:sectPr'):]
+        _docx_template = (parts, (head + '<w:body>').encode('utf-8'), tail.encode('utf-8'))
+    return _docx_template
+
+
+def _docx_text(piece):
+    """Return a w:t element, preserving whitespace at its ends as python-docx does."""
+    if piece != piece.strip():
+        return f'<w:t xml:space="preserve">{piece}</w:t>'
+    return f'<w:t>{piece}</w:t>'
+
+
+def docx_paragraph(text):
+    """
+    Return the WordprocessingML of a paragraph with a single run.
+    
+    The markup matches python-docx add_paragraph(): tabs and line breaks
+    become w:tab and w:br elements between the text pieces, and pieces with
+    leading or trailing whitespace are marked xml:space="preserve".
+    
+    Args:
+        text: Paragraph text
+    
+    Returns:
+        Paragraph XML as string
+    """
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if DOCX_INVALID_CHARS.search(text):
+        text = DOCX_INVALID_CHARS.sub('', text)
+    if not text:
+        return '<w:p/>'
+    if '\t' not in text and '\n' not in text and '\r' not in text:
+        return f'<w:p><w:r>{_docx_text(text)}</w:r></w:p>'
+    
+    pieces = []
+    for piece in DOCX_RUN_BREAKS.split(text):
+        if piece == '\t':
+            pieces.append('<w:tab/>')
+        elif piece in ('\n', '\r'):
+            pieces.append('<w:br/>')
+        elif piece:
+            pieces.append(_docx_text(piece))
+    return f'<w:p><w:r>{"".join(pieces)}</w:r></w:p>'
+
+
+def write_docx(paragraphs, output):
+    """
+    Write paragraphs as a Word document, streaming them into the package.
+    
+    The template parts are copied as they are and the document part is
+    compressed as paragraphs arrive, so no document tree is built and
+    peak memory does not depend on the length of the text.
+    
+    Args:
+        paragraphs: Iterable of paragraph strings
+        output: Output file path or writable binary file object
+    
+    Returns:
+        Dictionary with the number of paragraphs written
+    
+    Raises:
+        IOError: If the template cannot be read
+    """
+    parts, head, tail = load_docx_template()
+    count = 0
+    
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts:
+            package.writestr(name, data)
+        with package.open(DOCX_DOCUMENT_PART, 'w') as document:
+            document.write(head)
+            chunk = []
+            for paragraph in paragraphs:
+                chunk.append(docx_paragraph(paragraph))
+                if len(chunk) == DOCX_WRITE_CHUNK:
+                    document.write(''.join(chunk).encode('utf-8'))
+                    count += len(chunk)
+                    chunk = []
+            document.write(''.join(chunk).encode('utf-8'))
+            count += len(chunk)
+            document.write(tail)
+    return {'paragraphs': count}